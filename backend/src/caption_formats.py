@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+# caption_formats.py - Learns which timedtext format works best per caption track kind and language
+#
+# The stats file is shared by every fetcher process (see transcript_shards.py), so updates
+# re-read the file and write it back while holding an exclusive lock on a sidecar lock file.
+
+import os
+import json
+import threading
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows: fall back to in-process locking only
+    fcntl = None
+
+CAPTION_FORMATS = ['txt', 'json3']  # default order when nothing has been learned yet
+
+FORMAT_STATS_PATH = os.environ.get(
+    'CAPTION_FORMAT_STATS',
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'caption_format_stats.json')
+)
+
+_lock = threading.Lock()
+_stats = {}
+_stats_mtime = None
+
+def _track_key(kind, language_code):
+    return f"{kind}:{language_code or 'unknown'}"
+
+@contextmanager
+def _file_lock():
+    """Exclusive lock across processes for a read-modify-write of the stats file."""
+    if fcntl is None:
+        yield
+        return
+    os.makedirs(os.path.dirname(FORMAT_STATS_PATH), exist_ok=True)
+    with open(f"{FORMAT_STATS_PATH}.lock", 'a') as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+def _load_stats(force=False):
+    """Current stats, re-read whenever another process has rewritten the file."""
+    global _stats, _stats_mtime
+    try:
+        mtime = os.stat(FORMAT_STATS_PATH).st_mtime_ns
+    except OSError:
+        return _stats
+    if force or mtime != _stats_mtime:
+        try:
+            with open(FORMAT_STATS_PATH, 'r', encoding='utf-8') as f:
+                _stats = json.load(f)
+            _stats_mtime = mtime
+        except (OSError, ValueError):
+            pass
+    return _stats
+
+def _save_stats(stats):
+    global _stats, _stats_mtime
+    os.makedirs(os.path.dirname(FORMAT_STATS_PATH), exist_ok=True)
+    tmp_path = f"{FORMAT_STATS_PATH}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(stats, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, FORMAT_STATS_PATH)
+    _stats = stats
+    _stats_mtime = os.stat(FORMAT_STATS_PATH).st_mtime_ns
+
+def _success_rate(counts):
+    # Laplace smoothing so a single early failure does not bury a format forever
+    return (counts.get('success', 0) + 1) / (counts.get('success', 0) + counts.get('failure', 0) + 2)
+
+def get_format_order(kind, language_code):
+    """Formats to try for a track, best known first.
+
+    Uses the stats for this kind and language, falling back to the totals for the
+    track kind, then to the default order.
+    """
+    with _lock:
+        stats = _load_stats()
+        by_format = stats.get(_track_key(kind, language_code))
+        if not by_format:
+            by_format = {}
+            for key, formats in stats.items():
+                if key.startswith(f"{kind}:"):
+                    for fmt, counts in formats.items():
+                        total = by_format.setdefault(fmt, {'success': 0, 'failure': 0})
+                        total['success'] += counts.get('success', 0)
+                        total['failure'] += counts.get('failure', 0)
+
+    # sorted() is stable, so ties keep the default order
+    return sorted(CAPTION_FORMATS, key=lambda fmt: -_success_rate(by_format.get(fmt, {})))
+
+def record_format_outcome(kind, language_code, fmt, success):
+    """Record whether fetching a track in the given format produced a usable transcript."""
+    with _lock:
+        try:
+            with _file_lock():
+                # Re-read under the lock so counts written by other processes are kept
+                stats = json.loads(json.dumps(_load_stats(force=True)))
+                counts = stats.setdefault(_track_key(kind, language_code), {}).setdefault(
+                    fmt, {'success': 0, 'failure': 0}
+                )
+                counts['success' if success else 'failure'] += 1
+                _save_stats(stats)
+        except OSError:
+            pass  # Stats are an optimisation; a read-only disk must not fail the fetch
@@ -5,6 +5,7 @@ This configuration is used by transcript_fetcher.py
 """
 
 import os
+import json
 
 # Lightning Proxies configuration
 PROXY_CONFIG = {
@@ -15,12 +16,66 @@ PROXY_CONFIG = {
     'enabled': True  # Set to False to disable proxy
 }
 
+# Default YouTube cookie file used by the fetcher
+DEFAULT_COOKIE_FILE = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'cookies', 'www.youtube.com_cookies.txt')
+
+# Proxy/cookie identity this process is bound to (see set_active_identity)
+_active_identity = None
+
+def _current_config():
+    """PROXY_CONFIG with the active identity's overrides applied."""
+    if _active_identity:
+        return {**PROXY_CONFIG, **{k: v for k, v in _active_identity.items() if k in PROXY_CONFIG}}
+    return PROXY_CONFIG
+
+def _proxy_url(config):
+    return f"http://{config['username']}:{config['password']}@{config['host']}:{config['port']}"
+
+def get_proxy_identities(count=1):
+    """Get `count` proxy/cookie identities for sharded fetcher workers.
+
+    Identities come from the PROXY_IDENTITIES environment variable, a JSON list of
+    objects overriding any of host/port/username/password/enabled plus an optional
+    cookie_file. Without it every worker shares PROXY_CONFIG and the default cookies.
+    Identities are reused round-robin when there are fewer than `count`.
+    """
+    try:
+        configured = json.loads(os.environ.get('PROXY_IDENTITIES', '[]'))
+    except ValueError:
+        configured = []
+    if not isinstance(configured, list) or not all(isinstance(item, dict) for item in configured):
+        configured = []
+    if not configured:
+        configured = [{}]
+
+    identities = []
+    for i in range(count):
+        overrides = configured[i % len(configured)]
+        identities.append({
+            'name': overrides.get('name', f"identity-{i % len(configured)}"),
+            **{k: v for k, v in overrides.items() if k in PROXY_CONFIG},
+            'cookie_file': overrides.get('cookie_file', DEFAULT_COOKIE_FILE)
+        })
+    return identities
+
+def set_active_identity(identity):
+    """Bind this process to one identity from get_proxy_identities (None restores the default)."""
+    global _active_identity
+    _active_identity = identity
+
+def get_cookie_file():
+    """Get the cookie file for the active identity."""
+    if _active_identity and _active_identity.get('cookie_file'):
+        return _active_identity['cookie_file']
+    return DEFAULT_COOKIE_FILE
+
 def get_proxy_config():
     """Get proxy configuration for requests."""
-    if not PROXY_CONFIG['enabled']:
+    config = _current_config()
+    if not config['enabled']:
         return None
-    
-    proxy_url = f"http://{PROXY_CONFIG['username']}:{PROXY_CONFIG['password']}@{PROXY_CONFIG['host']}:{PROXY_CONFIG['port']}"
+
+    proxy_url = _proxy_url(config)
     return {
         'http': proxy_url,
         'https': proxy_url
@@ -29,11 +84,12 @@ def get_proxy_config():
 def get_urllib_proxy_handler():
     """Get proxy handler for urllib."""
     import urllib.request
-    
-    if not PROXY_CONFIG['enabled']:
+
+    config = _current_config()
+    if not config['enabled']:
         return None
-    
-    proxy_url = f"http://{PROXY_CONFIG['username']}:{PROXY_CONFIG['password']}@{PROXY_CONFIG['host']}:{PROXY_CONFIG['port']}"
+
+    proxy_url = _proxy_url(config)
     proxy_handler = urllib.request.ProxyHandler({
         'http': proxy_url,
         'https': proxy_url
@@ -42,17 +98,19 @@ def get_urllib_proxy_handler():
 
 def log_proxy_status():
     """Log proxy status."""
-    if PROXY_CONFIG['enabled']:
-        print(f"[PROXY] Proxy enabled: {PROXY_CONFIG['host']}:{PROXY_CONFIG['port']}", flush=True)
+    config = _current_config()
+    if config['enabled']:
+        print(f"[PROXY] Proxy enabled: {config['host']}:{config['port']}", flush=True)
     else:
         print("[PROXY] Proxy disabled", flush=True)
 
 def is_proxy_enabled():
     """Check if proxy is enabled."""
-    return PROXY_CONFIG['enabled']
+    return _current_config()['enabled']
 
 def get_proxy_host_port():
     """Get proxy host and port for logging."""
-    if PROXY_CONFIG['enabled']:
-        return f"{PROXY_CONFIG['host']}:{PROXY_CONFIG['port']}"
-    return None 
\ No newline at end of file
+    config = _current_config()
+    if config['enabled']:
+        return f"{config['host']}:{config['port']}"
+    return None
@@ -0,0 +1,429 @@
+#!/usr/bin/env python3
+# linkedin_snapshots.py - Incremental, indexed store for the data/linkedin_posts_<user>_<timestamp>.json dumps
+#
+# Each dump is a full snapshot of a profile's posts. Snapshots are streamed post by
+# post, merged by post id, and only engagement changes are kept as history rows.
+#
+# Usage:
+#   linkedin_snapshots.py load [--dir DATA_DIR]
+#   linkedin_snapshots.py latest USERNAME [-n N]
+#   linkedin_snapshots.py history POST_ID
+#   linkedin_snapshots.py stats
+
+import os
+import re
+import sys
+import json
+import time
+import sqlite3
+import argparse
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data')
+
+SNAPSHOT_DB_PATH = os.environ.get('LINKEDIN_SNAPSHOT_DB', os.path.join(DATA_DIR, 'linkedin_posts.db'))
+
+SNAPSHOT_FILE_PATTERN = re.compile(r'^linkedin_posts_(.+)_(\d+)\.json$')
+
+READ_CHUNK_SIZE = 64 * 1024
+
+# Post fields that live in their own columns
+POST_COLUMN_FIELDS = {'id', 'date', 'content', 'url', 'type', 'isRepost', 'likes', 'comments', 'shares', 'reactions'}
+# Per-snapshot copies of profile data (kept once in profiles) and volatile display fields
+REDUNDANT_FIELDS = {'profileData', 'authorInfo', 'userId', 'savedAt', 'dateRelative'}
+# Author details repeated on every post; kept once in authors, keyed by the post's authorProfile
+AUTHOR_FIELDS = {'author': 'name', 'authorHeadline': 'headline', 'authorAvatar': 'avatar'}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS snapshots (
+    file TEXT PRIMARY KEY,
+    username TEXT NOT NULL,
+    taken_at_ms INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    mtime REAL NOT NULL,
+    post_count INTEGER NOT NULL,
+    loaded_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS profiles (
+    username TEXT PRIMARY KEY,
+    user_id TEXT,
+    name TEXT,
+    headline TEXT,
+    profile_url TEXT,
+    avatar TEXT,
+    updated_ms INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS authors (
+    profile_url TEXT PRIMARY KEY,
+    name TEXT,
+    headline TEXT,
+    avatar TEXT,
+    updated_ms INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS posts (
+    post_id TEXT PRIMARY KEY,
+    date TEXT,
+    content TEXT,
+    url TEXT,
+    type TEXT,
+    is_repost INTEGER,
+    likes INTEGER,
+    comments INTEGER,
+    shares INTEGER,
+    reactions TEXT,
+    extra TEXT,
+    first_seen_ms INTEGER NOT NULL,
+    last_seen_ms INTEGER NOT NULL
+);
+-- A post can show up on several profiles' activity (reposts), so users map to posts many-to-many
+CREATE TABLE IF NOT EXISTS user_posts (
+    username TEXT NOT NULL,
+    post_id TEXT NOT NULL,
+    date TEXT,
+    last_seen_ms INTEGER NOT NULL,
+    PRIMARY KEY (username, post_id)
+);
+CREATE INDEX IF NOT EXISTS idx_user_posts_date ON user_posts (username, date DESC);
+CREATE TABLE IF NOT EXISTS post_history (
+    post_id TEXT NOT NULL,
+    snapshot_ms INTEGER NOT NULL,
+    likes INTEGER,
+    comments INTEGER,
+    shares INTEGER,
+    reactions TEXT,
+    PRIMARY KEY (post_id, snapshot_ms)
+);
+"""
+
+def connect(db_path=None):
+    """Open the snapshot store, creating the schema on first use."""
+    db_path = db_path or SNAPSHOT_DB_PATH
+    os.makedirs(os.path.dirname(db_path), exist_ok=True)
+    conn = sqlite3.connect(db_path, timeout=30, isolation_level=None)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript(SCHEMA)
+    return conn
+
+class _StreamReader:
+    """Minimal pull parser over a file: decodes one JSON value at a time from a sliding buffer."""
+
+    def __init__(self, f):
+        self._file = f
+        self._decoder = json.JSONDecoder()
+        self._buffer = ''
+        self._pos = 0
+        self._eof = False
+
+    def _fill(self):
+        chunk = self._file.read(READ_CHUNK_SIZE)
+        if not chunk:
+            self._eof = True
+            return False
+        # Drop what has been consumed so memory stays bounded by the largest single value
+        self._buffer = self._buffer[self._pos:] + chunk
+        self._pos = 0
+        return True
+
+    def peek(self):
+        """Next non-whitespace character, or '' at end of file."""
+        while True:
+            while self._pos < len(self._buffer) and self._buffer[self._pos] in ' \t\r\n':
+                self._pos += 1
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+            if not self._fill():
+                return ''
+
+    def expect(self, char):
+        if self.peek() != char:
+            raise ValueError(f"Expected {char!r} at offset {self._pos}, found {self.peek()!r}")
+        self._pos += 1
+
+    def value(self):
+        """Decode the next complete JSON value."""
+        self.peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._pos)
+                # A value ending exactly at the buffer edge may be a truncated number or literal
+                if end < len(self._buffer) or self._eof:
+                    self._pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self._eof:
+                    raise
+            if not self._fill():
+                value, self._pos = self._decoder.raw_decode(self._buffer, self._pos)
+                return value
+
+def iter_snapshot(path):
+    """Stream a snapshot file, yielding ('post', post) per post and ('field', (key, value)) for the rest."""
+    with open(path, 'r', encoding='utf-8') as f:
+        reader = _StreamReader(f)
+        reader.expect('{')
+        if reader.peek() == '}':
+            return
+        while True:
+            key = reader.value()
+            reader.expect(':')
+            if key == 'posts' and reader.peek() == '[':
+                reader.expect('[')
+                if reader.peek() != ']':
+                    while True:
+                        yield 'post', reader.value()
+                        if reader.peek() != ',':
+                            break
+                        reader.expect(',')
+                reader.expect(']')
+            else:
+                yield 'field', (key, reader.value())
+            if reader.peek() != ',':
+                break
+            reader.expect(',')
+        reader.expect('}')
+
+def _engagement(post):
+    return (post.get('likes'), post.get('comments'), post.get('shares'),
+            json.dumps(post.get('reactions') or [], sort_keys=True))
+
+def _merge_post(conn, username, post, snapshot_ms):
+    post_id = post.get('id') or post.get('url')
+    if not post_id:
+        return
+    likes, comments, shares, reactions = _engagement(post)
+    author_profile = post.get('authorProfile')
+    # Without a profile URL there is nothing to key the author on, so those fields stay with the post
+    dropped = REDUNDANT_FIELDS | set(AUTHOR_FIELDS) if author_profile else REDUNDANT_FIELDS
+    extra = json.dumps(
+        {k: v for k, v in post.items() if k not in POST_COLUMN_FIELDS and k not in dropped},
+        separators=(',', ':'), sort_keys=True
+    )
+    if author_profile:
+        _merge_author(conn, author_profile, post, snapshot_ms)
+
+    existing = conn.execute("SELECT first_seen_ms, last_seen_ms FROM posts WHERE post_id = ?", (post_id,)).fetchone()
+    if existing is None:
+        conn.execute(
+            "INSERT INTO posts (post_id, date, content, url, type, is_repost, likes, comments, shares, "
+            "reactions, extra, first_seen_ms, last_seen_ms) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (post_id, post.get('date'), post.get('content'), post.get('url'), post.get('type'),
+             1 if post.get('isRepost') else 0, likes, comments, shares, reactions, extra, snapshot_ms, snapshot_ms)
+        )
+    elif snapshot_ms >= existing['last_seen_ms']:
+        conn.execute(
+            "UPDATE posts SET date = ?, content = ?, url = ?, type = ?, is_repost = ?, likes = ?, comments = ?, "
+            "shares = ?, reactions = ?, extra = ?, last_seen_ms = ? WHERE post_id = ?",
+            (post.get('date'), post.get('content'), post.get('url'), post.get('type'),
+             1 if post.get('isRepost') else 0, likes, comments, shares, reactions, extra, snapshot_ms, post_id)
+        )
+    elif snapshot_ms < existing['first_seen_ms']:
+        conn.execute("UPDATE posts SET first_seen_ms = ? WHERE post_id = ?", (snapshot_ms, post_id))
+
+    conn.execute(
+        "INSERT INTO user_posts (username, post_id, date, last_seen_ms) VALUES (?, ?, ?, ?) "
+        "ON CONFLICT (username, post_id) DO UPDATE SET date = excluded.date, last_seen_ms = excluded.last_seen_ms "
+        "WHERE excluded.last_seen_ms >= user_posts.last_seen_ms",
+        (username, post_id, post.get('date'), snapshot_ms)
+    )
+
+    # Only keep a history row when engagement differs from the previous observation
+    previous = conn.execute(
+        "SELECT likes, comments, shares, reactions FROM post_history WHERE post_id = ? AND snapshot_ms <= ? "
+        "ORDER BY snapshot_ms DESC LIMIT 1",
+        (post_id, snapshot_ms)
+    ).fetchone()
+    if previous is None or tuple(previous) != (likes, comments, shares, reactions):
+        conn.execute(
+            "INSERT OR REPLACE INTO post_history (post_id, snapshot_ms, likes, comments, shares, reactions) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (post_id, snapshot_ms, likes, comments, shares, reactions)
+        )
+
+def _merge_author(conn, profile_url, post, snapshot_ms):
+    conn.execute(
+        "INSERT INTO authors (profile_url, name, headline, avatar, updated_ms) VALUES (?, ?, ?, ?, ?) "
+        "ON CONFLICT (profile_url) DO UPDATE SET name = excluded.name, headline = excluded.headline, "
+        "avatar = excluded.avatar, updated_ms = excluded.updated_ms WHERE excluded.updated_ms >= authors.updated_ms",
+        (profile_url, post.get('author'), post.get('authorHeadline'), post.get('authorAvatar'), snapshot_ms)
+    )
+
+def _merge_profile(conn, username, profile, user_id, snapshot_ms):
+    row = conn.execute("SELECT updated_ms FROM profiles WHERE username = ?", (username,)).fetchone()
+    if row and row['updated_ms'] > snapshot_ms:
+        return
+    conn.execute(
+        "INSERT OR REPLACE INTO profiles (username, user_id, name, headline, profile_url, avatar, updated_ms) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?)",
+        (username, user_id, profile.get('name'), profile.get('headline'), profile.get('profileUrl'),
+         profile.get('avatar'), snapshot_ms)
+    )
+
+def load_snapshot(conn, path):
+    """Merge one snapshot file. Returns the number of posts read, or None if it was already loaded."""
+    name = os.path.basename(path)
+    match = SNAPSHOT_FILE_PATTERN.match(name)
+    if not match:
+        return None
+    username, snapshot_ms = match.group(1), int(match.group(2))
+    stat = os.stat(path)
+
+    loaded = conn.execute("SELECT size, mtime FROM snapshots WHERE file = ?", (name,)).fetchone()
+    if loaded and loaded['size'] == stat.st_size and loaded['mtime'] == stat.st_mtime:
+        return None
+
+    post_count = 0
+    profile = {}
+    user_id = None
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        for kind, item in iter_snapshot(path):
+            if kind == 'post':
+                _merge_post(conn, username, item, snapshot_ms)
+                post_count += 1
+            elif item[0] == 'profileData' and isinstance(item[1], dict):
+                profile = item[1]
+            elif item[0] == 'userId':
+                user_id = item[1]
+        _merge_profile(conn, username, profile, user_id, snapshot_ms)
+        conn.execute(
+            "INSERT OR REPLACE INTO snapshots (file, username, taken_at_ms, size, mtime, post_count, loaded_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (name, username, snapshot_ms, stat.st_size, stat.st_mtime, post_count, time.time())
+        )
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+    return post_count
+
+def load_directory(conn, data_dir=DATA_DIR):
+    """Merge every new or changed snapshot in a directory, oldest first."""
+    files = []
+    for name in os.listdir(data_dir):
+        match = SNAPSHOT_FILE_PATTERN.match(name)
+        if match:
+            files.append((int(match.group(2)), name))
+
+    loaded = skipped = posts = 0
+    errors = {}
+    for _, name in sorted(files):
+        try:
+            count = load_snapshot(conn, os.path.join(data_dir, name))
+        except (OSError, ValueError) as e:
+            errors[name] = str(e)
+            continue
+        if count is None:
+            skipped += 1
+        else:
+            loaded += 1
+            posts += count
+    return {'loaded': loaded, 'skipped': skipped, 'posts_read': posts, 'errors': errors}
+
+def _post_from_row(row, authors):
+    post = json.loads(row['extra'] or '{}')
+    author = authors.get(post.get('authorProfile'))
+    if author:
+        for field, column in AUTHOR_FIELDS.items():
+            post[field] = author[column]
+    post.update({
+        'id': row['post_id'],
+        'date': row['date'],
+        'content': row['content'],
+        'url': row['url'],
+        'type': row['type'],
+        'isRepost': bool(row['is_repost']),
+        'likes': row['likes'],
+        'comments': row['comments'],
+        'shares': row['shares'],
+        'reactions': json.loads(row['reactions'] or '[]'),
+        'firstSeenAt': row['first_seen_ms'],
+        'lastSeenAt': row['last_seen_ms']
+    })
+    return post
+
+def latest_posts(conn, username, limit=10):
+    """Most recent posts for a user by post date, served from the (username, date) index."""
+    rows = conn.execute(
+        "SELECT p.* FROM user_posts u JOIN posts p ON p.post_id = u.post_id "
+        "WHERE u.username = ? ORDER BY u.date DESC LIMIT ?",
+        (username, limit)
+    ).fetchall()
+    profile_urls = {json.loads(row['extra'] or '{}').get('authorProfile') for row in rows} - {None}
+    authors = {}
+    if profile_urls:
+        authors = {
+            author['profile_url']: author for author in conn.execute(
+                f"SELECT * FROM authors WHERE profile_url IN ({','.join('?' * len(profile_urls))})",
+                list(profile_urls)
+            )
+        }
+    return [_post_from_row(row, authors) for row in rows]
+
+def engagement_history(conn, post_id):
+    """Engagement observations for a post, one entry per change."""
+    rows = conn.execute(
+        "SELECT snapshot_ms, likes, comments, shares, reactions FROM post_history WHERE post_id = ? "
+        "ORDER BY snapshot_ms",
+        (post_id,)
+    ).fetchall()
+    history = []
+    previous = None
+    for row in rows:
+        entry = {
+            'snapshotAt': row['snapshot_ms'],
+            'likes': row['likes'],
+            'comments': row['comments'],
+            'shares': row['shares'],
+            'reactions': json.loads(row['reactions'] or '[]')
+        }
+        if previous:
+            entry['delta'] = {
+                key: (row[key] or 0) - (previous[key] or 0) for key in ('likes', 'comments', 'shares')
+            }
+        history.append(entry)
+        previous = row
+    return history
+
+def get_stats(conn):
+    """Per-user post and snapshot counts."""
+    users = {}
+    for row in conn.execute("SELECT username, COUNT(*) AS n, MAX(date) AS newest FROM user_posts GROUP BY username"):
+        users[row['username']] = {'posts': row['n'], 'newest_post': row['newest']}
+    for row in conn.execute("SELECT username, COUNT(*) AS n, MAX(taken_at_ms) AS latest FROM snapshots GROUP BY username"):
+        users.setdefault(row['username'], {}).update({'snapshots': row['n'], 'latest_snapshot': row['latest']})
+    history_rows = conn.execute("SELECT COUNT(*) FROM post_history").fetchone()[0]
+    return {'users': users, 'history_rows': history_rows}
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Indexed store for LinkedIn post snapshots')
+    parser.add_argument('--db', default=SNAPSHOT_DB_PATH, help='Path to the snapshot database')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    load_parser = subparsers.add_parser('load', help='Merge new snapshot files into the store')
+    load_parser.add_argument('--dir', default=DATA_DIR)
+
+    latest_parser = subparsers.add_parser('latest', help='Latest posts for a user')
+    latest_parser.add_argument('username')
+    latest_parser.add_argument('-n', type=int, default=10)
+
+    history_parser = subparsers.add_parser('history', help='Engagement changes for a post')
+    history_parser.add_argument('post_id')
+
+    subparsers.add_parser('stats', help='Show what the store holds')
+
+    args = parser.parse_args(argv)
+    conn = connect(args.db)
+
+    if args.command == 'load':
+        output = {'success': True, **load_directory(conn, args.dir)}
+    elif args.command == 'latest':
+        output = {'success': True, 'posts': latest_posts(conn, args.username, args.n)}
+    elif args.command == 'history':
+        output = {'success': True, 'history': engagement_history(conn, args.post_id)}
+    else:
+        output = {'success': True, **get_stats(conn)}
+    print(json.dumps(output))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
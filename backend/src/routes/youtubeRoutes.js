@@ -11,6 +11,7 @@ const fs = require('fs');
 const xml2js = require('xml2js');
 const { getChannelVideos, createCarousels, saveYoutubeVideo, getUserSavedVideos, deleteSavedVideo, saveVideoTranscript, saveMultipleVideos } = require('../controllers/youtubeController');
 const SavedVideo = require('../models/savedVideo');
+const { runFramedFetcher } = require('../utils/fetcherFrames');
 const os = require('os');
 
 // Load environment variables
@@ -127,28 +128,11 @@ router.post('/transcript', async (req, res) => {
     try {
       console.log(`Running Python script with ${pythonExecutable} for video ID: ${videoId}`);
       
-      // Run the Python script from the project root to ensure all paths work correctly
-      const command = `"${pythonExecutable}" "${scriptPath}" --debug ${videoId}`;
-      console.log(`Executing command: ${command}`);
-      
-      const { stdout, stderr } = await execPromise(command);
-      
-      if (stderr) {
-        console.error('Python script stderr:', stderr);
-      }
-      
-      // Parse JSON from stdout, handling debug output
-      let result;
-      try {
-        // If using debug mode, the JSON will be on the last line
-        const lines = stdout.trim().split('\n');
-        const jsonLine = lines[lines.length - 1];
-        result = JSON.parse(jsonLine);
-      } catch (parseError) {
-        console.error('Error parsing JSON from Python script:', parseError);
-        console.error('Raw stdout:', stdout);
-        throw new Error(`Invalid JSON response from Python script: ${parseError.message}`);
-      }
+      // Framed output keeps debug logging (sent to stderr) out of the result
+      console.log(`Executing: ${pythonExecutable} ${scriptPath} --framed --debug --chunks ${videoId}`);
+      const result = await runFramedFetcher(pythonExecutable, scriptPath, ['--debug', '--chunks', videoId], {
+        onLog: (data) => console.error('Python script stderr:', data)
+      });
       
       // Validate transcript content
       if (result.success && result.transcript && result.transcript.trim().length > 0) {
@@ -198,6 +182,8 @@ router.post('/transcript', async (req, res) => {
           success: true,
           transcript: result.transcript,
           formattedTranscript,
+          // Token-bounded, timestamped chunks for carousel/post generation
+          chunks: result.chunks || [],
           source: result.source || 'YouTube Transcript API',
           language: result.language || 'en',
           channelTitle: result.channelTitle || 'Unknown Channel',
@@ -317,28 +303,11 @@ router.get('/transcript', async (req, res) => {
       
         console.log(`Running Python script with ${pythonExecutable} for video ID: ${videoId}`);
         
-        // Run the Python script from the project root to ensure all paths work correctly
-        const command = `"${pythonExecutable}" "${scriptPath}" --debug ${videoId}`;
-        console.log(`Executing command: ${command}`);
-        
-        const { stdout, stderr } = await execPromise(command);
-        
-        if (stderr) {
-          console.error('Python script stderr:', stderr);
-        }
-        
-        // Parse JSON from stdout, handling debug output
-        let result;
-        try {
-          // If using debug mode, the JSON will be on the last line
-          const lines = stdout.trim().split('\n');
-          const jsonLine = lines[lines.length - 1];
-          result = JSON.parse(jsonLine);
-        } catch (parseError) {
-          console.error('Error parsing JSON from Python script:', parseError);
-          console.error('Raw stdout:', stdout);
-          throw new Error(`Invalid JSON response from Python script: ${parseError.message}`);
-        }
+        // Framed output keeps debug logging (sent to stderr) out of the result
+        console.log(`Executing: ${pythonExecutable} ${scriptPath} --framed --debug ${videoId}`);
+        const result = await runFramedFetcher(pythonExecutable, scriptPath, ['--debug', videoId], {
+          onLog: (data) => console.error('Python script stderr:', data)
+        });
         
         if (result.success) {
           // Store in cache
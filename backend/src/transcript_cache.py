@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+# transcript_cache.py - Reads and writes the transcripts/ cache shared with the Node backend
+
+import os
+import json
+from datetime import datetime, timezone
+
+# Node resolves this as path.join(process.cwd(), 'transcripts') with cwd = backend/
+TRANSCRIPTS_DIR = os.environ.get(
+    'TRANSCRIPTS_DIR',
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'transcripts')
+)
+
+def get_cache_path(video_id, transcripts_dir=None):
+    """Get the cache file path for a video ID."""
+    return os.path.join(transcripts_dir or TRANSCRIPTS_DIR, f"{video_id}.json")
+
+def load_cached_transcript(video_id, transcripts_dir=None):
+    """Load a cached transcript, or None if it is missing, unreadable or empty."""
+    path = get_cache_path(video_id, transcripts_dir)
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            saved = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not saved or not str(saved.get('transcript', '')).strip():
+        return None
+    return saved
+
+def save_transcript_result(result, transcripts_dir=None):
+    """Save a successful get_transcript result in the format the Node routes read back."""
+    if not result.get('success') or not result.get('transcript'):
+        return None
+
+    directory = transcripts_dir or TRANSCRIPTS_DIR
+    os.makedirs(directory, exist_ok=True)
+
+    entry = {
+        'transcript': result['transcript'],
+        'language': result.get('language_code') or result.get('language') or 'en',
+        'is_generated': result.get('is_generated', False),
+        'extractedAt': datetime.now(timezone.utc).isoformat(timespec='milliseconds').replace('+00:00', 'Z'),
+        'duration': result.get('duration', 'N/A'),
+        'title': result.get('videoTitle', ''),
+        'channelName': result.get('channelTitle', ''),
+        'source': result.get('source', 'transcript_fetcher')
+    }
+
+    # Write to a temp file first so Node never reads a half-written transcript
+    path = get_cache_path(result['video_id'], directory)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(entry, f, indent=2)
+    os.replace(tmp_path, path)
+    return path
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+# transcript_chunks.py - Splits a transcript into token-bounded, timestamped chunks for LLM generation
+#
+# Chunks are built in one pass over the segment stream. A chunk closes at the last sentence end
+# that fits (or at a segment boundary when there is none) and the next chunk starts with the
+# trailing units of the previous one as overlap. Only the overlap and the back-scan for a
+# sentence end are revisited, so the work stays linear in the transcript length.
+#
+# Token counts are estimates (about 4 characters per token for English) so no tokenizer is needed.
+
+import os
+import re
+from collections import deque
+
+CHUNK_MAX_TOKENS = int(os.environ.get('TRANSCRIPT_CHUNK_TOKENS', '800'))
+CHUNK_OVERLAP_TOKENS = int(os.environ.get('TRANSCRIPT_CHUNK_OVERLAP', '100'))
+CHARS_PER_TOKEN = 4
+
+_SENTENCE_RE = re.compile(r'[^.!?]+(?:[.!?]+["\')\]]*|$)')
+_SENTENCE_END_RE = re.compile(r'[.!?]["\')\]]*$')
+
+def estimate_tokens(text):
+    """Approximate token count of a piece of text."""
+    return max(1, (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN)
+
+def _unit(text, start_ms, end_ms):
+    return {'text': text, 'start_ms': start_ms, 'end_ms': end_ms, 'tokens': estimate_tokens(text)}
+
+def _split_oversized(unit, max_tokens):
+    """Split a unit longer than max_tokens on word boundaries, interpolating its timestamps."""
+    words = unit['text'].split()
+    pieces, current = [], []
+    for word in words:
+        if current and estimate_tokens(' '.join(current + [word])) > max_tokens:
+            pieces.append(' '.join(current))
+            current = []
+        current.append(word)
+    if current:
+        pieces.append(' '.join(current))
+
+    timed = unit['start_ms'] is not None and unit['end_ms'] is not None
+    total_chars = sum(len(piece) for piece in pieces) or 1
+    offset = 0
+    for piece in pieces:
+        start_ms = end_ms = None
+        if timed:
+            span = unit['end_ms'] - unit['start_ms']
+            start_ms = unit['start_ms'] + span * offset // total_chars
+            offset += len(piece)
+            end_ms = unit['start_ms'] + span * offset // total_chars
+        yield _unit(piece, start_ms, end_ms)
+
+def iter_units(result):
+    """Yield the units a chunk can break between: timed segments when the result has them,
+    otherwise the sentences of the plain transcript (with no timestamps)."""
+    segments = result.get('segments')
+    if segments:
+        for segment in segments:
+            text = ' '.join(segment['text'].split())
+            if text:
+                yield _unit(text, segment.get('start_ms'), segment.get('end_ms'))
+        return
+    for match in _SENTENCE_RE.finditer(result.get('transcript') or ''):
+        text = ' '.join(match.group(0).split())
+        if text:
+            yield _unit(text, None, None)
+
+def _make_chunk(index, units, overlap_tokens):
+    return {
+        'index': index,
+        'text': ' '.join(unit['text'] for unit in units),
+        'start_ms': units[0]['start_ms'],
+        'end_ms': units[-1]['end_ms'],
+        'tokens': sum(unit['tokens'] for unit in units),
+        'overlap_tokens': overlap_tokens
+    }
+
+def iter_chunks(units, max_tokens=CHUNK_MAX_TOKENS, overlap_tokens=CHUNK_OVERLAP_TOKENS):
+    """Group a stream of units into chunks of at most max_tokens, each starting with up to
+    overlap_tokens of the previous chunk's tail. Yields each chunk as soon as it is complete."""
+    if max_tokens <= 0:
+        raise ValueError("max_tokens must be positive")
+    if not 0 <= overlap_tokens <= max_tokens // 2:
+        raise ValueError("overlap_tokens must be between 0 and half of max_tokens")
+
+    window = deque()
+    window_tokens = 0
+    carried_tokens = 0  # tokens at the head of the window repeated from the previous chunk
+    index = 0
+
+    def pending(stream):
+        for unit in stream:
+            if unit['tokens'] > max_tokens:
+                yield from _split_oversized(unit, max_tokens)
+            else:
+                yield unit
+
+    for unit in pending(units):
+        while window_tokens + unit['tokens'] > max_tokens and window_tokens > carried_tokens:
+            # Close at the last sentence end in the second half of the chunk, else at the last
+            # segment boundary; never cut inside the overlap carried from the previous chunk
+            cut = len(window)
+            prefix_tokens = window_tokens
+            for i in range(len(window) - 1, -1, -1):
+                if prefix_tokens <= max(carried_tokens, max_tokens // 2):
+                    break
+                if _SENTENCE_END_RE.search(window[i]['text']):
+                    cut = i + 1
+                    break
+                prefix_tokens -= window[i]['tokens']
+            emitted = [window.popleft() for _ in range(cut)]
+            yield _make_chunk(index, emitted, carried_tokens)
+            index += 1
+
+            # Seed the next chunk with the emitted tail, as long as the new unit still fits
+            window_tokens -= sum(u['tokens'] for u in emitted)
+            carried_tokens = 0
+            for tail in reversed(emitted):
+                if carried_tokens + tail['tokens'] > overlap_tokens:
+                    break
+                if window_tokens + tail['tokens'] + unit['tokens'] > max_tokens:
+                    break
+                window.appendleft(tail)
+                carried_tokens += tail['tokens']
+                window_tokens += tail['tokens']
+
+        window.append(unit)
+        window_tokens += unit['tokens']
+
+    if window_tokens > carried_tokens:
+        yield _make_chunk(index, list(window), carried_tokens)
+
+def chunk_result(result, max_tokens=CHUNK_MAX_TOKENS, overlap_tokens=CHUNK_OVERLAP_TOKENS):
+    """Chunk a get_transcript result, preferring its timed segments over the plain text."""
+    return list(iter_chunks(iter_units(result), max_tokens, overlap_tokens))
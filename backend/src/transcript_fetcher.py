@@ -20,13 +20,21 @@ if "--debug" in sys.argv:
     DEBUG = True
     sys.argv.remove("--debug")  # Remove the debug flag
 
+# Framed output (see transcript_framing.py): frames own stdout, so all logging goes to stderr
+FRAMED = False
+if __name__ == "__main__" and "--framed" in sys.argv:
+    FRAMED = True
+    sys.argv.remove("--framed")
+    FRAME_STREAM = sys.stdout.buffer
+    sys.stdout = sys.stderr
+
 def debug_print(*args, **kwargs):
     if DEBUG:
         print(*args, **kwargs, flush=True)
 
 # Import proxy configuration
 try:
-    from config.proxy_config import get_proxy_config, get_urllib_proxy_handler, log_proxy_status, is_proxy_enabled, get_proxy_host_port
+    from config.proxy_config import get_proxy_config, get_urllib_proxy_handler, log_proxy_status, is_proxy_enabled, get_proxy_host_port, get_cookie_file
 except ImportError:
     # Fallback configuration if config file is not available
     debug_print("Warning: Could not import proxy config, using fallback configuration")
@@ -79,9 +87,13 @@ except ImportError:
             return f"{PROXY_CONFIG['host']}:{PROXY_CONFIG['port']}"
         return None
 
+    def get_cookie_file():
+        """Get the YouTube cookie file."""
+        return os.path.join(os.path.dirname(os.path.dirname(__file__)), 'src', 'cookies', 'www.youtube.com_cookies.txt')
+
 # Load cookies from file
 def load_cookies():
-    cookie_file = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'src', 'cookies', 'www.youtube.com_cookies.txt')
+    cookie_file = get_cookie_file()
     debug_print(f"Loading cookies from: {cookie_file}")
     cookie_jar = http.cookiejar.MozillaCookieJar(cookie_file)
     try:
@@ -96,6 +108,7 @@ def load_cookies():
 try_ytapi = True
 try:
     from youtube_transcript_api import YouTubeTranscriptApi
+    from youtube_transcript_api._transcripts import TranscriptListFetcher
     from youtube_transcript_api._errors import TranscriptsDisabled, NoTranscriptFound, VideoUnavailable
     from youtube_transcript_api.formatters import JSONFormatter
     
@@ -107,9 +120,9 @@ try:
             super().__init__()
 
         def _initialize_innertube_session(self):
-            session = super()._initialize_innertube_session()
+            # Pooled per proxy so connections opened by warm-up are reused across fetches
+            session = get_http_session(self._proxies)
             if self._proxies:
-                session.proxies.update(self._proxies)
                 debug_print(f"Using proxy for YouTube Transcript API: {self._proxies['https']}")
             return session
 
@@ -124,11 +137,11 @@ try:
             try:
                 # Try direct YouTubeTranscriptApi first
                 try:
-                    transcript_list = YouTubeTranscriptApi.list_transcripts(self.video_id)
+                    transcript_list = TranscriptListFetcher(get_http_session()).fetch(self.video_id)
                     debug_print("Successfully got transcript list using direct API")
                 except Exception as direct_error:
                     debug_print(f"Direct API failed: {str(direct_error)}, trying with proxy...")
-                    transcript_list = super().list_transcripts(self.video_id)
+                    transcript_list = TranscriptListFetcher(self._initialize_innertube_session()).fetch(self.video_id)
                     debug_print("Successfully got transcript list using proxy")
                 
                 # Debug: List all available transcripts
@@ -184,6 +197,43 @@ from urllib.request import urlopen, Request, build_opener, HTTPCookieProcessor,
 from urllib.parse import urlencode
 import re
 
+from transcript_warmup import get_http_session, warm_up
+from caption_formats import get_format_order, record_format_outcome
+import transcript_index
+from transcript_chunks import chunk_result
+from transcript_framing import write_result
+
+# Successful results are added to the local search index (set to "false" to skip)
+TRANSCRIPT_INDEX_ENABLED = os.environ.get('TRANSCRIPT_INDEX_ENABLED', 'true').lower() != 'false'
+
+# Seconds between youtube_transcript_api attempts
+API_RETRY_DELAY = 1
+
+# Why a method failed, reported per method in get_transcript's 'errors':
+#   no_transcript - the video has no usable transcript; another proxy identity will not help
+#   blocked       - YouTube or the proxy refused this IP/identity (429, 403, captcha)
+#   network       - the request did not complete (proxy down, timeout, connection reset)
+#   other         - anything else
+NO_TRANSCRIPT_ERROR_TYPES = {'TranscriptsDisabled', 'NoTranscriptFound', 'NoTranscriptAvailable', 'VideoUnavailable',
+                             'InvalidVideoId'}
+BLOCKED_ERROR_TYPES = {'TooManyRequests', 'CookiesInvalid', 'FailedToCreateConsentCookie'}
+NETWORK_ERROR_TYPES = {'ProxyError', 'ConnectionError', 'ConnectTimeout', 'ReadTimeout', 'Timeout', 'SSLError',
+                       'URLError', 'TimeoutError', 'timeout', 'RemoteDisconnected'}
+ERROR_KIND_PRIORITY = ['no_transcript', 'blocked', 'network', 'other']
+
+# Origin for watch pages in the scraping paths (overridable to point at a stand-in server)
+YOUTUBE_BASE_URL = os.environ.get('YOUTUBE_BASE_URL', 'https://www.youtube.com')
+
+# Browser-like headers sent by the manual scraping paths
+SCRAPING_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+    'Accept-Language': 'en-US,en;q=0.5',
+    'Accept-Encoding': 'gzip, deflate',
+    'Connection': 'keep-alive',
+    'Upgrade-Insecure-Requests': '1'
+}
+
 def extract_video_id(url_or_id):
     """Extract video ID from URL or return the ID if already an ID."""
     if 'youtube.com' in url_or_id or 'youtu.be' in url_or_id:
@@ -220,12 +270,12 @@ def get_transcript_with_api(video_id, use_proxy=True, max_retries=3):
             debug_print("\nGetting transcript list...")
             try:
                 # Try direct YouTubeTranscriptApi first
-                    transcript_list = YouTubeTranscriptApi.list_transcripts(video_id)
+                try:
+                    transcript_list = TranscriptListFetcher(get_http_session()).fetch(video_id)
                     debug_print("Successfully got transcript list using direct API")
                 except Exception as direct_error:
                     debug_print(f"Direct API failed: {str(direct_error)}, trying with proxy...")
-                try:
-            transcript_list = ProxyAwareYouTubeTranscriptApi.list_transcripts(video_id, proxies=proxies)
+                    transcript_list = ProxyAwareYouTubeTranscriptApi.list_transcripts(video_id, proxies=proxies)
                     debug_print("Successfully got transcript list using proxy")
             except Exception as list_error:
                 debug_print(f"Error getting transcript list: {str(list_error)}")
@@ -235,10 +285,10 @@ def get_transcript_with_api(video_id, use_proxy=True, max_retries=3):
             
             # Debug: List all available transcripts
             try:
-            available_transcripts = list(transcript_list)
+                available_transcripts = list(transcript_list)
                 debug_print(f"\nFound {len(available_transcripts)} available transcripts:")
-            for i, t in enumerate(available_transcripts):
-                debug_print(f"  {i+1}. {t.language} ({t.language_code}) - Generated: {getattr(t, 'is_generated', 'Unknown')}")
+                for i, t in enumerate(available_transcripts):
+                    debug_print(f"  {i+1}. {t.language} ({t.language_code}) - Generated: {getattr(t, 'is_generated', 'Unknown')}")
             except Exception as list_error:
                 debug_print(f"Error listing transcripts: {str(list_error)}")
                 debug_print(f"Error type: {type(list_error)}")
@@ -255,7 +305,7 @@ def get_transcript_with_api(video_id, use_proxy=True, max_retries=3):
                 debug_print(f"Error finding English transcript: {str(e)}")
                 debug_print("Trying to get first available transcript")
                 if available_transcripts:
-                transcript = available_transcripts[0]
+                    transcript = available_transcripts[0]
                     debug_print(f"Selected first available transcript: {transcript.language_code}")
                 else:
                     debug_print("No transcripts available")
@@ -270,7 +320,7 @@ def get_transcript_with_api(video_id, use_proxy=True, max_retries=3):
             # Fetch the transcript data
             debug_print("\nFetching transcript data...")
             try:
-            transcript_data = transcript.fetch()
+                transcript_data = transcript.fetch()
                 debug_print(f"Successfully fetched transcript data with {len(transcript_data)} segments")
             except Exception as fetch_error:
                 debug_print(f"Error fetching transcript data: {str(fetch_error)}")
@@ -285,10 +335,18 @@ def get_transcript_with_api(video_id, use_proxy=True, max_retries=3):
             # Process transcript data
             debug_print("\nProcessing transcript data...")
             transcript_text = ""
+            segments = []
             for segment in transcript_data:
                 try:
                     if isinstance(segment, dict) and 'text' in segment:
                         transcript_text += segment['text'].strip() + " "
+                        if 'start' in segment:
+                            start = float(segment['start'])
+                            segments.append({
+                                'start_ms': int(start * 1000),
+                                'end_ms': int((start + float(segment.get('duration', 0))) * 1000),
+                                'text': segment['text'].strip()
+                            })
                     elif hasattr(segment, 'text'):
                         transcript_text += str(segment.text).strip() + " "
                     else:
@@ -316,6 +374,7 @@ def get_transcript_with_api(video_id, use_proxy=True, max_retries=3):
                 'is_generated': getattr(transcript, 'is_generated', False),
                 'channelTitle': "Unknown Channel",
                 'videoTitle': "Unknown Title",
+                'segments': segments,
                 'source': 'youtube_transcript_api_with_proxy' if (use_proxy and proxies) else 'youtube_transcript_api'
             }
             
@@ -326,7 +385,7 @@ def get_transcript_with_api(video_id, use_proxy=True, max_retries=3):
             debug_print(f"Full error details: {traceback.format_exc()}")
             if attempt < max_retries - 1:
                 debug_print("Retrying...")
-                time.sleep(1)  # Wait a bit before retrying
+                time.sleep(API_RETRY_DELAY)  # Wait a bit before retrying
             continue
     
     # If we get here, all attempts failed
@@ -334,9 +393,146 @@ def get_transcript_with_api(video_id, use_proxy=True, max_retries=3):
     return {
         'success': False,
         'error': str(last_error),
+        'error_type': type(last_error).__name__,
         'video_id': video_id
     }
 
+class CaptionContentError(ValueError):
+    """A caption track downloaded fine but its content was unusable in the requested format."""
+
+def parse_caption_body(body, caption_format):
+    """Turn a timedtext response body into (transcript text, timed segments).
+
+    Only json3 carries timings; for txt the segment list is empty.
+    """
+    if caption_format == 'json3':
+        caption_data = json.loads(body)
+        transcript_pieces = []
+        segments = []
+        for event in caption_data.get('events', []):
+            event_pieces = [seg['utf8'].strip() for seg in event.get('segs', []) if 'utf8' in seg]
+            transcript_pieces.extend(event_pieces)
+            event_text = ' '.join(piece for piece in event_pieces if piece)
+            if event_text and 'tStartMs' in event:
+                start_ms = int(event['tStartMs'])
+                segments.append({
+                    'start_ms': start_ms,
+                    'end_ms': start_ms + int(event.get('dDurationMs', 0)),
+                    'text': event_text
+                })
+        return ' '.join(transcript_pieces).strip(), segments
+    return body.strip(), []
+
+def download_caption_track(opener, base_url, caption_format, headers):
+    """Download a caption track in one format and return validated (transcript text, segments)."""
+    request = Request(f"{base_url}&fmt={caption_format}", headers=headers)
+    response = opener.open(request, timeout=30)
+    return decode_caption_track(response.read(), caption_format)
+
+def decode_caption_track(raw_data, caption_format):
+    """Decode and validate a downloaded caption track, returning (transcript text, segments)."""
+    # Handle gzip-compressed responses
+    if raw_data[:2] == b'\x1f\x8b':  # gzip magic number
+        import gzip
+        raw_data = gzip.decompress(raw_data)
+        debug_print(f"Decompressed gzip {caption_format} caption response")
+    
+    transcript, segments = parse_caption_body(raw_data.decode('utf-8'), caption_format)
+    
+    # Validate transcript content
+    if not transcript or len(transcript.split()) < 10:  # At least 10 words
+        debug_print(f"{caption_format} transcript too short or empty")
+        raise CaptionContentError("Invalid transcript content")
+    return transcript, segments
+
+def parse_watch_page(html):
+    """Pull channel name, duration and the first caption track out of a watch page.
+
+    Returns a dict with channel_title, duration, base_url, language, language_code and
+    is_generated, or with an 'error' message when the page has no usable caption track.
+    """
+    # Extract channel name
+    channel_title = "Unknown Channel"
+    channel_match = re.search(r'"channelName":"([^"]+)"', html)
+    if channel_match:
+        channel_title = channel_match.group(1)
+    else:
+        # Alternative pattern
+        channel_match = re.search(r'<link itemprop="name" content="([^"]+)"', html)
+        if channel_match:
+            channel_title = channel_match.group(1)
+    
+    debug_print(f"Found channel name: {channel_title}")
+    
+    # Try to find duration
+    duration = "N/A"
+    duration_match = re.search(r'"lengthSeconds":"(\d+)"', html)
+    if duration_match:
+        seconds = int(duration_match.group(1))
+        minutes = seconds // 60
+        remaining_seconds = seconds % 60
+        duration = f"{minutes:02d}:{remaining_seconds:02d}"
+        if minutes >= 60:
+            hours = minutes // 60
+            minutes = minutes % 60
+            duration = f"{hours:02d}:{minutes:02d}:{remaining_seconds:02d}"
+    
+    debug_print(f"Found duration: {duration}")
+    
+    # Basic check if captions are available
+    if '"captionTracks":' not in html:
+        debug_print("No caption tracks found in HTML")
+        return {'error': 'No captions available for this video'}
+    
+    # Extract caption track info - safer approach
+    caption_parts = html.split('"captionTracks":')[1].split(',"translationLanguages"')
+    if not caption_parts:
+        debug_print("Could not parse caption tracks")
+        return {'error': 'Could not parse caption tracks'}
+        
+    caption_info = caption_parts[0]
+    
+    # Manual parsing instead of using json.loads which can fail
+    # Look for baseUrl of English captions
+    base_url = None
+    language = "Unknown"
+    language_code = "unknown"
+    is_generated = False
+    
+    # Find the first caption track baseUrl
+    url_match = re.search(r'"baseUrl":"([^"]+)"', caption_info)
+    if url_match:
+        base_url = url_match.group(1)
+        base_url = base_url.replace('\\u0026', '&')
+        
+        # Try to find language info
+        lang_match = re.search(r'"languageCode":"([^"]+)"', caption_info)
+        if lang_match:
+            language_code = lang_match.group(1)
+            
+        name_match = re.search(r'"name":{"simpleText":"([^"]+)"', caption_info)
+        if name_match:
+            language = name_match.group(1)
+            
+        kind_match = re.search(r'"kind":"([^"]+)"', caption_info)
+        if kind_match and kind_match.group(1) == 'asr':
+            is_generated = True
+        
+        debug_print(f"Found captions: {language} ({language_code}), auto-generated: {is_generated}")
+    
+    if not base_url:
+        debug_print("Could not find caption URL")
+        return {'error': 'Could not find caption URL'}
+    
+    return {
+        'channel_title': channel_title,
+        'duration': duration,
+        'base_url': base_url,
+        'language': language,
+        'language_code': language_code,
+        'is_generated': is_generated
+    }
+
 def fetch_transcript_manually(video_id):
     """Fetch transcript for a YouTube video using basic HTTP requests with proxy support (fallback method)."""
     try:
@@ -357,15 +553,8 @@ def fetch_transcript_manually(video_id):
         opener = build_opener(*handlers)
         
         # First try to get video info to check if transcripts are available
-        url = f"https://www.youtube.com/watch?v={video_id}"
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-            'Accept-Language': 'en-US,en;q=0.5',
-            'Accept-Encoding': 'gzip, deflate',
-            'Connection': 'keep-alive',
-            'Upgrade-Insecure-Requests': '1'
-        }
+        url = f"{YOUTUBE_BASE_URL}/watch?v={video_id}"
+        headers = SCRAPING_HEADERS
         
         request = Request(url, headers=headers)
         
@@ -400,117 +589,42 @@ def fetch_transcript_manually(video_id):
                 'source': 'manual_scraping_with_proxy' if proxy_handler else 'manual_scraping'
             }
         
-        # Extract channel name
-        channel_title = "Unknown Channel"
-        channel_match = re.search(r'"channelName":"([^"]+)"', html)
-        if channel_match:
-            channel_title = channel_match.group(1)
-        else:
-            # Alternative pattern
-            channel_match = re.search(r'<link itemprop="name" content="([^"]+)"', html)
-            if channel_match:
-                channel_title = channel_match.group(1)
-        
-        debug_print(f"Found channel name: {channel_title}")
-        
-        # Try to find duration
-        duration = "N/A"
-        duration_match = re.search(r'"lengthSeconds":"(\d+)"', html)
-        if duration_match:
-            seconds = int(duration_match.group(1))
-            minutes = seconds // 60
-            remaining_seconds = seconds % 60
-            duration = f"{minutes:02d}:{remaining_seconds:02d}"
-            if minutes >= 60:
-                hours = minutes // 60
-                minutes = minutes % 60
-                duration = f"{hours:02d}:{minutes:02d}:{remaining_seconds:02d}"
-        
-        debug_print(f"Found duration: {duration}")
-        
-        # Basic check if captions are available
-        if '"captionTracks":' not in html:
-            debug_print("No caption tracks found in HTML")
-            return {
-                'success': False,
-                'error': 'No captions available for this video',
-                'video_id': video_id,
-                'source': 'manual_scraping_with_proxy' if proxy_handler else 'manual_scraping'
-            }
-        
-        # Extract caption track info - safer approach
-        caption_parts = html.split('"captionTracks":')[1].split(',"translationLanguages"')
-        if not caption_parts:
-            debug_print("Could not parse caption tracks")
+        page = parse_watch_page(html)
+        if page.get('error'):
             return {
                 'success': False,
-                'error': 'Could not parse caption tracks',
+                'error': page['error'],
                 'video_id': video_id,
                 'source': 'manual_scraping_with_proxy' if proxy_handler else 'manual_scraping'
             }
-            
-        caption_info = caption_parts[0]
+        channel_title = page['channel_title']
+        duration = page['duration']
+        base_url = page['base_url']
+        language = page['language']
+        language_code = page['language_code']
+        is_generated = page['is_generated']
         
-        # Manual parsing instead of using json.loads which can fail
-        # Look for baseUrl of English captions
-        base_url = None
-        language = "Unknown"
-        language_code = "unknown"
-        is_generated = False
-        
-        # Find the first caption track baseUrl
-        url_match = re.search(r'"baseUrl":"([^"]+)"', caption_info)
-        if url_match:
-            base_url = url_match.group(1)
-            base_url = base_url.replace('\\u0026', '&')
-            
-            # Try to find language info
-            lang_match = re.search(r'"languageCode":"([^"]+)"', caption_info)
-            if lang_match:
-                language_code = lang_match.group(1)
-                
-            name_match = re.search(r'"name":{"simpleText":"([^"]+)"', caption_info)
-            if name_match:
-                language = name_match.group(1)
-                
-            kind_match = re.search(r'"kind":"([^"]+)"', caption_info)
-            if kind_match and kind_match.group(1) == 'asr':
-                is_generated = True
-            
-            debug_print(f"Found captions: {language} ({language_code}), auto-generated: {is_generated}")
+        # Try the format that has worked best for this kind of track first
+        track_kind = 'asr' if is_generated else 'manual'
+        format_order = get_format_order(track_kind, language_code)
+        debug_print(f"Caption format order for {track_kind}/{language_code}: {format_order}")
         
-        if not base_url:
-            debug_print("Could not find caption URL")
-            return {
-                'success': False,
-                'error': 'Could not find caption URL',
-                'video_id': video_id,
-                'source': 'manual_scraping_with_proxy' if proxy_handler else 'manual_scraping'
-            }
-        
-        # Get caption data in text format
-        try:
-            debug_print("Fetching captions as text...")
-            caption_url = base_url + '&fmt=txt'
-            request = Request(caption_url, headers=headers)
-            response = opener.open(request, timeout=30)
-            
-            # Handle gzip-compressed responses
-            raw_data = response.read()
-            if raw_data[:2] == b'\x1f\x8b':  # gzip magic number
-                import gzip
-                transcript = gzip.decompress(raw_data).decode('utf-8')
-                debug_print("Decompressed gzip caption response")
-            else:
-                transcript = raw_data.decode('utf-8')
-            
-            # Validate transcript content
-            transcript = transcript.strip()
-            if not transcript or len(transcript.split()) < 10:  # At least 10 words
-                debug_print("Transcript too short or empty")
-                raise Exception("Invalid transcript content")
+        last_error = None
+        for caption_format in format_order:
+            try:
+                debug_print(f"Fetching captions as {caption_format}...")
+                transcript, segments = download_caption_track(opener, base_url, caption_format, headers)
+            except Exception as e:
+                debug_print(f"Error fetching {caption_format} captions: {e}")
+                # Only parse/validation failures say something about the format; timeouts,
+                # 429s and connection resets are transport problems and are not counted
+                if isinstance(e, ValueError):
+                    record_format_outcome(track_kind, language_code, caption_format, False)
+                last_error = e
+                continue
             
-            debug_print(f"Successfully fetched transcript with {len(transcript)} characters")
+            record_format_outcome(track_kind, language_code, caption_format, True)
+            debug_print(f"Successfully fetched {caption_format} transcript with {len(transcript)} characters")
             return {
                 'success': True,
                 'transcript': transcript,
@@ -520,70 +634,24 @@ def fetch_transcript_manually(video_id):
                 'video_id': video_id,
                 'channelTitle': channel_title,
                 'duration': duration,
+                'caption_format': caption_format,
+                'segments': segments,
                 'source': 'manual_scraping_with_proxy' if proxy_handler else 'manual_scraping'
             }
-        except Exception as e:
-            debug_print(f"Error fetching text captions: {e}")
-            # Try to get raw JSON
-            try:
-                debug_print("Trying to fetch captions as JSON...")
-                caption_url = base_url + '&fmt=json3'
-                request = Request(caption_url, headers=headers)
-                response = opener.open(request, timeout=30)
-                
-                # Handle gzip-compressed responses
-                raw_data = response.read()
-                if raw_data[:2] == b'\x1f\x8b':  # gzip magic number
-                    import gzip
-                    json_text = gzip.decompress(raw_data).decode('utf-8')
-                    debug_print("Decompressed gzip JSON caption response")
-                else:
-                    json_text = raw_data.decode('utf-8')
-                
-                caption_data = json.loads(json_text)
-                
-                # Extract transcript from JSON
-                transcript_pieces = []
-                if 'events' in caption_data:
-                    for event in caption_data['events']:
-                        if 'segs' in event:
-                            for seg in event['segs']:
-                                if 'utf8' in seg:
-                                    transcript_pieces.append(seg['utf8'].strip())
-                
-                transcript = ' '.join(transcript_pieces).strip()
-                
-                # Validate transcript content
-                if not transcript or len(transcript.split()) < 10:  # At least 10 words
-                    debug_print("JSON transcript too short or empty")
-                    raise Exception("Invalid transcript content")
-                
-                debug_print(f"Successfully fetched JSON transcript with {len(transcript)} characters")
-                return {
-                    'success': True,
-                    'transcript': transcript,
-                    'language': language,
-                    'language_code': language_code,
-                    'is_generated': is_generated,
-                    'video_id': video_id,
-                    'channelTitle': channel_title,
-                    'duration': duration,
-                    'source': 'manual_scraping_with_proxy' if proxy_handler else 'manual_scraping'
-                }
-            except Exception as json_err:
-                debug_print(f"Error fetching JSON captions: {json_err}")
-                return {
-                    'success': False,
-                    'error': f"Failed to parse caption data: {str(json_err)}",
-                    'video_id': video_id,
-                    'source': 'manual_scraping_with_proxy' if proxy_handler else 'manual_scraping'
-                }
+        
+        return {
+            'success': False,
+            'error': f"Failed to parse caption data: {str(last_error)}",
+            'video_id': video_id,
+            'source': 'manual_scraping_with_proxy' if proxy_handler else 'manual_scraping'
+        }
     except Exception as e:
         debug_print(f"Error in fetch_transcript_manually: {e}")
         debug_print(traceback.format_exc())
         return {
             'success': False,
             'error': str(e),
+            'error_type': type(e).__name__,
             'traceback': traceback.format_exc(),
             'video_id': video_id,
             'source': 'manual_scraping_with_proxy' if get_urllib_proxy_handler() else 'manual_scraping'
@@ -628,6 +696,46 @@ def get_transcript_with_requests(video_id):
             'source': 'requests_scraping'
         }
 
+def index_transcript_result(result):
+    """Add a successful result to the search index; indexing problems never fail the fetch."""
+    if not TRANSCRIPT_INDEX_ENABLED:
+        return
+    try:
+        conn = transcript_index.connect()
+        try:
+            transcript_index.index_result(conn, result)
+        finally:
+            conn.close()
+    except Exception as e:
+        debug_print(f"Could not index transcript for {result.get('video_id')}: {e}")
+
+def classify_error(error, error_type=None):
+    """Map a failed method's error (and exception class name, when known) to an error kind."""
+    if error_type in NO_TRANSCRIPT_ERROR_TYPES:
+        return 'no_transcript'
+    if error_type in BLOCKED_ERROR_TYPES:
+        return 'blocked'
+    if error_type in NETWORK_ERROR_TYPES:
+        return 'network'
+    message = str(error or '').lower()
+    if any(marker in message for marker in ('429', '403', 'too many requests', 'forbidden', 'blocking', 'captcha')):
+        return 'blocked'
+    if any(marker in message for marker in ('network error', 'timed out', 'proxyerror', 'connection', 'tunnel')):
+        return 'network'
+    if any(marker in message for marker in ('no captions', 'no transcripts', 'subtitles are disabled',
+                                            'no longer available', 'could not find caption url')):
+        return 'no_transcript'
+    return 'other'
+
+def method_error(method, result):
+    """Per-method failure entry for get_transcript's 'errors' list."""
+    return {
+        'method': method,
+        'error': result.get('error'),
+        'error_type': result.get('error_type'),
+        'error_kind': classify_error(result.get('error'), result.get('error_type'))
+    }
+
 def get_transcript(video_id):
     """Main function that tries multiple methods to get a transcript."""
     # First extract video ID if it's a URL
@@ -636,6 +744,7 @@ def get_transcript(video_id):
     
     # Log proxy status
     log_proxy_status()
+    errors = []
     
     # First method: YouTube Transcript API with proxy (this is what works!)
     if try_ytapi:
@@ -643,16 +752,20 @@ def get_transcript(video_id):
         result = get_transcript_with_api(video_id, use_proxy=True)  # Always use proxy for YT API
         if result['success']:
             debug_print("YouTube Transcript API method succeeded")
+            index_transcript_result(result)
             return result
         debug_print(f"YouTube Transcript API method failed: {result.get('error')}")
+        errors.append(method_error('youtube_transcript_api', result))
         
         # Try again without proxy
         debug_print("Trying YouTube Transcript API method without proxy...")
         result = get_transcript_with_api(video_id, use_proxy=False)
         if result['success']:
             debug_print("YouTube Transcript API method without proxy succeeded")
+            index_transcript_result(result)
             return result
         debug_print(f"YouTube Transcript API method without proxy failed: {result.get('error')}")
+        errors.append(method_error('youtube_transcript_api_no_proxy', result))
 
     # Fallback methods if YouTube Transcript API fails
     debug_print("YouTube Transcript API failed, trying fallback methods...")
@@ -663,8 +776,10 @@ def get_transcript(video_id):
         result = get_transcript_with_ytdlp(video_id)
         if result['success']:
             debug_print("yt-dlp method succeeded")
+            index_transcript_result(result)
             return result
         debug_print(f"yt-dlp method failed: {result.get('error')}")
+        errors.append(method_error('yt-dlp', result))
     
     # Method 3: requests + BeautifulSoup scraping
     if try_requests:
@@ -672,28 +787,56 @@ def get_transcript(video_id):
         result = get_transcript_with_requests(video_id)
         if result['success']:
             debug_print("requests/BeautifulSoup method succeeded")
+            index_transcript_result(result)
             return result
         debug_print(f"requests/BeautifulSoup method failed: {result.get('error')}")
+        errors.append(method_error('requests', result))
     
     # If all methods fail
+    kinds = {error['error_kind'] for error in errors}
     return {
         'success': False,
         'error': 'All transcript extraction methods failed',
+        'error_kind': next((kind for kind in ERROR_KIND_PRIORITY if kind in kinds), 'other'),
+        'errors': errors,
         'video_id': video_id,
         'methods_tried': ['youtube_transcript_api', 'youtube_transcript_api_no_proxy', 'yt-dlp', 'requests']
     }
 
+def health_check():
+    """Warm up this process's sessions and report whether YouTube is reachable through the proxy."""
+    warmup = warm_up()
+    return {
+        'success': warmup['state'] == 'warm',
+        'message': 'Transcript fetcher is warm' if warmup['state'] == 'warm'
+                   else 'Transcript fetcher could not pre-connect to YouTube',
+        'proxy_enabled': is_proxy_enabled(),
+        'proxy_host': get_proxy_host_port(),
+        'warmup': warmup
+    }
+
 if __name__ == "__main__":
-    # Handle test flag first
-    if "--test" in sys.argv:
-        print(json.dumps({
-            'success': True,
-            'message': 'Transcript fetcher is working correctly',
-            'proxy_enabled': is_proxy_enabled(),
-            'proxy_host': get_proxy_host_port()
-        }))
+    # Health check (--test is kept as an alias for older callers)
+    if "--health" in sys.argv or "--test" in sys.argv:
+        print(json.dumps(health_check()))
         sys.exit(0)
         
+    # Emit token-bounded chunks alongside the transcript for downstream generation
+    with_chunks = "--chunks" in sys.argv
+    if with_chunks:
+        sys.argv.remove("--chunks")
+
+    # Single-line JSON stays the default; --compress gzips the framed transcript body
+    compress = "--compress" in sys.argv
+    if compress:
+        sys.argv.remove("--compress")
+
+    def emit(result):
+        if FRAMED:
+            write_result(FRAME_STREAM, result, compress)
+        else:
+            print(json.dumps(result))
+
     # Normal video ID processing
     video_id = None
     for arg in sys.argv[1:]:
@@ -702,19 +845,22 @@ if __name__ == "__main__":
             break
     
     if video_id is None:
-        print(json.dumps({
+        emit({
             'success': False,
-            'error': 'Missing video ID. Usage: transcript_fetcher.py [--debug] VIDEO_ID'
-        }))
+            'error': 'Missing video ID. Usage: transcript_fetcher.py [--debug] [--chunks] [--framed [--compress]] VIDEO_ID'
+        })
         sys.exit(1)
     
     result = get_transcript(video_id)
+    if with_chunks and result.get('success'):
+        result['chunks'] = chunk_result(result)
+    # Segment timings are for the Python-side consumers; keep the Node payload unchanged
+    result.pop('segments', None)
     try:
-        json_result = json.dumps(result)
-        print(json_result)
+        emit(result)
     except Exception as general_error:
-            print(json.dumps({
-                'success': False,
+        emit({
+            'success': False,
             'error': f"General error: {str(general_error)}",
-                'video_id': video_id
-            })) 
\ No newline at end of file
+            'video_id': video_id
+        })
@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+# transcript_fetcher_async.py - asyncio version of the manual scraping path in transcript_fetcher.py
+#
+# fetch_transcript_manually blocks a thread on urllib for every request. This module runs the
+# same steps (watch page, caption track discovery, timedtext with format fallback) on one event
+# loop with a small HTTP/1.1 client over asyncio streams, so thousands of fetches can be in
+# flight at once. Page and caption parsing are shared with the sync path, so results match.
+#
+# Usage: python transcript_fetcher_async.py [--concurrency N] [--timeout S] VIDEO_ID [VIDEO_ID ...]
+
+import io
+import ssl
+import json
+import base64
+import asyncio
+import argparse
+import traceback
+import contextlib
+import http.client
+import http.cookiejar
+import urllib.request
+from urllib.parse import urljoin, urlsplit, unquote
+
+import transcript_fetcher as fetcher
+from transcript_fetcher import decode_caption_track, parse_watch_page, debug_print
+from caption_formats import get_format_order, record_format_outcome
+
+REQUEST_TIMEOUT = 30  # seconds per HTTP request, as in the sync path
+DEFAULT_CONCURRENCY = 200
+MAX_REDIRECTS = 5
+MAX_HEADER_BYTES = 1 << 20
+
+_ssl_context = None
+
+class HTTPStatusError(Exception):
+    """Non-2xx response; formatted like urllib's HTTPError so error strings match the sync path."""
+
+    def __init__(self, code, reason):
+        super().__init__(f"HTTP Error {code}: {reason}")
+        self.code = code
+        self.reason = reason
+
+class _Response:
+    """Just enough of a urllib response for CookieJar.extract_cookies."""
+
+    def __init__(self, status, reason, headers, body):
+        self.status = status
+        self.reason = reason
+        self.headers = headers
+        self.body = body
+
+    def info(self):
+        return self.headers
+
+def _get_ssl_context():
+    global _ssl_context
+    if _ssl_context is None:
+        _ssl_context = ssl.create_default_context()
+    return _ssl_context
+
+def _proxy_authorization(proxy):
+    if proxy.username is None:
+        return None
+    credentials = f"{unquote(proxy.username)}:{unquote(proxy.password or '')}"
+    return 'Basic ' + base64.b64encode(credentials.encode('utf-8')).decode('ascii')
+
+async def _read_head(reader):
+    """Read a status line and headers, returning (status, reason, HTTPMessage)."""
+    head = await reader.readuntil(b'\r\n\r\n')
+    status_line, _, header_block = head.partition(b'\r\n')
+    parts = status_line.decode('iso-8859-1').split(' ', 2)
+    if len(parts) < 2 or not parts[0].startswith('HTTP/') or not parts[1].isdigit():
+        raise http.client.BadStatusLine(status_line.decode('iso-8859-1', 'replace'))
+    headers = http.client.parse_headers(io.BytesIO(header_block))
+    return int(parts[1]), parts[2] if len(parts) > 2 else '', headers
+
+async def _read_body(reader, headers):
+    if headers.get('Transfer-Encoding', '').lower() == 'chunked':
+        pieces = []
+        while True:
+            size_line = (await reader.readline()).split(b';')[0].strip()
+            try:
+                size = int(size_line, 16)
+            except ValueError:
+                # Not a ValueError to callers: a broken transfer says nothing about the caption format
+                raise http.client.HTTPException(f"Bad chunk size {size_line!r}") from None
+            if size == 0:
+                await reader.readuntil(b'\r\n')  # trailer terminator (no trailers expected)
+                return b''.join(pieces)
+            pieces.append(await reader.readexactly(size))
+            await reader.readexactly(2)
+    if headers.get('Content-Length') is not None:
+        return await reader.readexactly(int(headers['Content-Length']))
+    return await reader.read()
+
+async def _open(url, proxy):
+    """Open a connection for url, tunnelling HTTPS through the proxy with CONNECT.
+
+    Returns (reader, writer, request target)."""
+    host = url.hostname
+    port = url.port or (443 if url.scheme == 'https' else 80)
+    target = url.path or '/'
+    if url.query:
+        target += f"?{url.query}"
+
+    if proxy is None:
+        reader, writer = await asyncio.open_connection(
+            host, port, ssl=_get_ssl_context() if url.scheme == 'https' else None,
+            server_hostname=host if url.scheme == 'https' else None, limit=MAX_HEADER_BYTES
+        )
+        return reader, writer, target
+
+    reader, writer = await asyncio.open_connection(proxy.hostname, proxy.port or 80, limit=MAX_HEADER_BYTES)
+    authorization = _proxy_authorization(proxy)
+    if url.scheme != 'https':
+        # Plain HTTP goes through the proxy in absolute form
+        return reader, writer, f"{url.scheme}://{url.netloc}{target}"
+
+    connect = f"CONNECT {host}:{port} HTTP/1.1\r\nHost: {host}:{port}\r\n"
+    if authorization:
+        connect += f"Proxy-Authorization: {authorization}\r\n"
+    writer.write((connect + "\r\n").encode('iso-8859-1'))
+    await writer.drain()
+    status, reason, _ = await _read_head(reader)
+    if status != 200:
+        writer.close()
+        raise OSError(f"Tunnel connection failed: {status} {reason}")
+    await writer.start_tls(_get_ssl_context(), server_hostname=host)
+    return reader, writer, target
+
+async def _request_once(url, headers, cookie_jar, proxy):
+    parsed = urlsplit(url)
+    cookie_request = urllib.request.Request(url, headers=headers)
+    if cookie_jar is not None:
+        cookie_jar.add_cookie_header(cookie_request)
+
+    reader, writer, target = await _open(parsed, proxy)
+    try:
+        lines = [f"GET {target} HTTP/1.1", f"Host: {parsed.netloc}"]
+        for name, value in cookie_request.header_items():
+            if name.lower() not in ('host', 'connection'):
+                lines.append(f"{name}: {value}")
+        # One request per connection keeps the client simple; the proxy pays the reconnect
+        lines.append("Connection: close")
+        if proxy is not None and parsed.scheme != 'https' and _proxy_authorization(proxy):
+            lines.append(f"Proxy-Authorization: {_proxy_authorization(proxy)}")
+        writer.write(("\r\n".join(lines) + "\r\n\r\n").encode('iso-8859-1'))
+        await writer.drain()
+
+        status, reason, response_headers = await _read_head(reader)
+        body = await _read_body(reader, response_headers)
+    finally:
+        writer.close()
+
+    response = _Response(status, reason, response_headers, body)
+    if cookie_jar is not None:
+        cookie_jar.extract_cookies(response, cookie_request)
+    return response
+
+async def fetch_url(url, headers, cookie_jar=None, proxy_url=None, timeout=REQUEST_TIMEOUT):
+    """GET a URL (following redirects) and return the raw body; raises HTTPStatusError on 4xx/5xx."""
+    proxy = urlsplit(proxy_url) if proxy_url else None
+    for _ in range(MAX_REDIRECTS + 1):
+        response = await asyncio.wait_for(_request_once(url, headers, cookie_jar, proxy), timeout)
+        if response.status in (301, 302, 303, 307, 308) and response.headers.get('Location'):
+            url = urljoin(url, response.headers['Location'])
+            continue
+        if response.status >= 400:
+            raise HTTPStatusError(response.status, response.reason)
+        return response.body
+    raise HTTPStatusError(response.status, 'Too many redirects')
+
+async def _fetch_transcript(video_id, timeout, cookie_jar):
+    proxies = fetcher.get_proxy_config()
+    proxy_url = proxies['https'] if proxies else None
+    source = 'manual_scraping_with_proxy' if proxy_url else 'manual_scraping'
+    headers = fetcher.SCRAPING_HEADERS
+    if proxy_url:
+        debug_print("Using proxy for async manual scraping")
+
+    try:
+        url = f"{fetcher.YOUTUBE_BASE_URL}/watch?v={video_id}"
+        try:
+            raw_data = await fetch_url(url, headers, cookie_jar, proxy_url, timeout)
+        except HTTPStatusError as e:
+            debug_print(f"HTTP Error {e.code}: {e.reason}")
+            if e.code == 403:
+                return {
+                    'success': False,
+                    'error': 'Access forbidden - YouTube may be blocking requests',
+                    'video_id': video_id,
+                    'source': source
+                }
+            raise
+        except (OSError, asyncio.IncompleteReadError, http.client.HTTPException) as e:
+            debug_print(f"Network error: {e}")
+            return {
+                'success': False,
+                'error': f'Network error: {str(e) or type(e).__name__}',
+                'video_id': video_id,
+                'source': source
+            }
+
+        if raw_data[:2] == b'\x1f\x8b':  # gzip magic number
+            import gzip
+            raw_data = gzip.decompress(raw_data)
+        page = parse_watch_page(raw_data.decode('utf-8'))
+        if page.get('error'):
+            return {'success': False, 'error': page['error'], 'video_id': video_id, 'source': source}
+
+        track_kind = 'asr' if page['is_generated'] else 'manual'
+        format_order = get_format_order(track_kind, page['language_code'])
+
+        last_error = None
+        for caption_format in format_order:
+            try:
+                raw_data = await fetch_url(f"{page['base_url']}&fmt={caption_format}", headers, cookie_jar,
+                                           proxy_url, timeout)
+                transcript, segments = decode_caption_track(raw_data, caption_format)
+            except Exception as e:
+                debug_print(f"Error fetching {caption_format} captions: {e}")
+                # As in the sync path, only parse/validation failures count against a format
+                if isinstance(e, ValueError):
+                    await asyncio.to_thread(record_format_outcome, track_kind, page['language_code'],
+                                            caption_format, False)
+                last_error = e
+                continue
+
+            await asyncio.to_thread(record_format_outcome, track_kind, page['language_code'], caption_format, True)
+            return {
+                'success': True,
+                'transcript': transcript,
+                'language': page['language'],
+                'language_code': page['language_code'],
+                'is_generated': page['is_generated'],
+                'video_id': video_id,
+                'channelTitle': page['channel_title'],
+                'duration': page['duration'],
+                'caption_format': caption_format,
+                'segments': segments,
+                'source': source
+            }
+
+        return {
+            'success': False,
+            'error': f"Failed to parse caption data: {str(last_error)}",
+            'video_id': video_id,
+            'source': source
+        }
+    except Exception as e:
+        debug_print(f"Error in get_transcript_async: {e}")
+        return {
+            'success': False,
+            'error': str(e),
+            'traceback': traceback.format_exc(),
+            'video_id': video_id,
+            'source': source
+        }
+
+async def get_transcript_async(video_id, semaphore=None, timeout=REQUEST_TIMEOUT, cookie_jar=None):
+    """Scrape a transcript without blocking the event loop.
+
+    Returns the same result dict as fetch_transcript_manually. Pass a shared asyncio.Semaphore
+    to bound how many fetches run at once, and a shared cookie jar to avoid re-reading the
+    cookie file for every video. Each HTTP request is limited to `timeout` seconds.
+    """
+    if cookie_jar is None:
+        cookie_jar = await asyncio.to_thread(fetcher.load_cookies) or http.cookiejar.CookieJar()
+    async with semaphore or contextlib.nullcontext():
+        return await _fetch_transcript(video_id, timeout, cookie_jar)
+
+async def get_transcripts_async(video_ids, concurrency=DEFAULT_CONCURRENCY, timeout=REQUEST_TIMEOUT):
+    """Fetch many transcripts on the current loop, at most `concurrency` at a time, in input order."""
+    semaphore = asyncio.Semaphore(concurrency)
+    cookie_jar = await asyncio.to_thread(fetcher.load_cookies) or http.cookiejar.CookieJar()
+    return await asyncio.gather(*(
+        get_transcript_async(video_id, semaphore, timeout, cookie_jar) for video_id in video_ids
+    ))
+
+def main():
+    parser = argparse.ArgumentParser(description='Scrape YouTube transcripts concurrently with asyncio')
+    parser.add_argument('video_ids', nargs='+')
+    parser.add_argument('--concurrency', type=int, default=DEFAULT_CONCURRENCY)
+    parser.add_argument('--timeout', type=float, default=REQUEST_TIMEOUT)
+    args = parser.parse_args()
+
+    video_ids = [fetcher.extract_video_id(video_id) for video_id in args.video_ids]
+    for result in asyncio.run(get_transcripts_async(video_ids, args.concurrency, args.timeout)):
+        result.pop('segments', None)
+        print(json.dumps(result), flush=True)
+
+if __name__ == "__main__":
+    main()
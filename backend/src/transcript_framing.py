@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+# transcript_framing.py - Length-prefixed framing for fetcher results sent to Node
+#
+# Frame layout (all integers big-endian):
+#   magic   4 bytes  b'TRF1'
+#   hlen    4 bytes  length of the JSON header
+#   blen    4 bytes  length of the body
+#   header  hlen bytes of UTF-8 JSON: the result's small fields plus
+#           {'body_fields': [...], 'encoding': 'identity' | 'gzip'}
+#   body    blen bytes: JSON object holding the bulky fields (transcript, chunks),
+#           gzip-compressed when encoding is 'gzip'
+#
+# The reader knows every message's size up front, so stray text on stdout cannot be mistaken
+# for a result and a multi-megabyte transcript is parsed once, straight from the buffer.
+# Node's decoder lives in src/utils/fetcherFrames.js.
+
+import gzip
+import json
+import struct
+
+MAGIC = b'TRF1'
+_PREFIX = struct.Struct('>4sII')
+BODY_FIELDS = ('transcript', 'chunks')
+ENCODINGS = ('identity', 'gzip')
+
+class FrameError(ValueError):
+    """Raised when a byte stream does not contain a well-formed frame."""
+
+def encode_frame(header, body=b''):
+    """Pack a header dict and body bytes into one frame."""
+    header_bytes = json.dumps(header, separators=(',', ':')).encode('utf-8')
+    return _PREFIX.pack(MAGIC, len(header_bytes), len(body)) + header_bytes + body
+
+def encode_result(result, compress=False):
+    """Frame a fetcher result, moving the bulky fields into the (optionally gzipped) body."""
+    header = {key: value for key, value in result.items() if key not in BODY_FIELDS}
+    bulky = {key: result[key] for key in BODY_FIELDS if key in result}
+    body = json.dumps(bulky, separators=(',', ':')).encode('utf-8') if bulky else b''
+    encoding = 'identity'
+    if compress and body:
+        body = gzip.compress(body, compresslevel=6)
+        encoding = 'gzip'
+    header['body_fields'] = sorted(bulky)
+    header['encoding'] = encoding
+    return encode_frame(header, body)
+
+def write_result(stream, result, compress=False):
+    """Write one framed result to a binary stream and flush it."""
+    stream.write(encode_result(result, compress))
+    stream.flush()
+
+def _read_exactly(stream, size):
+    data = stream.read(size)
+    while len(data) < size:
+        more = stream.read(size - len(data))
+        if not more:
+            break
+        data += more
+    return data
+
+def read_frame(stream):
+    """Read the next (header, body) from a binary stream, or None at a clean end of stream."""
+    prefix = _read_exactly(stream, _PREFIX.size)
+    if not prefix:
+        return None
+    if len(prefix) < _PREFIX.size:
+        raise FrameError("Truncated frame prefix")
+    magic, header_length, body_length = _PREFIX.unpack(prefix)
+    if magic != MAGIC:
+        raise FrameError(f"Bad frame magic {magic!r}")
+    header_bytes = _read_exactly(stream, header_length)
+    body = _read_exactly(stream, body_length)
+    if len(header_bytes) < header_length or len(body) < body_length:
+        raise FrameError("Truncated frame")
+    return json.loads(header_bytes.decode('utf-8')), body
+
+def decode_result(header, body):
+    """Rebuild the fetcher result dict from a frame."""
+    result = {key: value for key, value in header.items() if key not in ('body_fields', 'encoding')}
+    if body:
+        encoding = header.get('encoding', 'identity')
+        if encoding not in ENCODINGS:
+            raise FrameError(f"Unknown body encoding {encoding!r}")
+        if encoding == 'gzip':
+            body = gzip.decompress(body)
+        result.update(json.loads(body.decode('utf-8')))
+    return result
+
+def iter_results(stream):
+    """Yield every result framed on a binary stream."""
+    while True:
+        frame = read_frame(stream)
+        if frame is None:
+            return
+        yield decode_result(*frame)
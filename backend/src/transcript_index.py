@@ -0,0 +1,299 @@
+#!/usr/bin/env python3
+# transcript_index.py - Full-text search over fetched transcripts (SQLite FTS5) with timestamp hits
+#
+# Hits point at the caption segment that matched. Results without segment timings (the txt
+# caption format and transcripts backfilled from the cache) are indexed too, but their hits
+# have start_ms/end_ms of None and 'timed': False.
+#
+# Usage:
+#   transcript_index.py search [--limit N] [--hits N] [--raw] QUERY
+#   transcript_index.py index-cache [--dir TRANSCRIPTS_DIR]
+#   transcript_index.py stats
+
+import os
+import sys
+import json
+import time
+import html
+import bisect
+import hashlib
+import sqlite3
+import argparse
+
+from transcript_cache import TRANSCRIPTS_DIR
+
+INDEX_DB_PATH = os.environ.get(
+    'TRANSCRIPT_INDEX_DB',
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'transcript_index.db')
+)
+
+# Consecutive caption segments are merged into windows of about this length, so
+# multi-word queries can match across short ASR segments and the index stays small
+WINDOW_MS = 30000
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS videos (
+    video_id TEXT PRIMARY KEY,
+    language TEXT,
+    title TEXT,
+    channel TEXT,
+    source TEXT,
+    content_hash TEXT NOT NULL,
+    has_timings INTEGER NOT NULL,
+    window_count INTEGER NOT NULL,
+    indexed_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS windows (
+    id INTEGER PRIMARY KEY,
+    video_id TEXT NOT NULL,
+    start_ms INTEGER,
+    end_ms INTEGER,
+    text TEXT NOT NULL,
+    segments TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_windows_video ON windows (video_id);
+CREATE VIRTUAL TABLE IF NOT EXISTS windows_fts USING fts5(
+    text, content='windows', content_rowid='id', tokenize='unicode61 remove_diacritics 2'
+);
+CREATE TRIGGER IF NOT EXISTS windows_ai AFTER INSERT ON windows BEGIN
+    INSERT INTO windows_fts (rowid, text) VALUES (new.id, new.text);
+END;
+CREATE TRIGGER IF NOT EXISTS windows_ad AFTER DELETE ON windows BEGIN
+    INSERT INTO windows_fts (windows_fts, rowid, text) VALUES ('delete', old.id, old.text);
+END;
+"""
+
+def connect(db_path=None):
+    """Open the index database, creating the schema on first use."""
+    db_path = db_path or INDEX_DB_PATH
+    os.makedirs(os.path.dirname(db_path), exist_ok=True)
+    conn = sqlite3.connect(db_path, timeout=30, isolation_level=None)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.executescript(SCHEMA)
+    # Indexes created before segment offsets were stored get the column added in place
+    if 'segments' not in [row['name'] for row in conn.execute("PRAGMA table_info(windows)")]:
+        conn.execute("ALTER TABLE windows ADD COLUMN segments TEXT")
+    return conn
+
+def build_windows(segments, window_ms=WINDOW_MS):
+    """Merge timed segments into (start_ms, end_ms, text, offsets) windows in a single pass.
+
+    offsets lists [character offset in text, start_ms, end_ms] for each segment, so a match
+    inside the window can be mapped back to the segment it came from.
+    """
+    windows = []
+    start_ms = end_ms = None
+    pieces = []
+    offsets = []
+    length = 0
+    for segment in segments:
+        text = html.unescape(segment.get('text', '')).strip()
+        if not text:
+            continue
+        if pieces and segment['start_ms'] - start_ms >= window_ms:
+            windows.append((start_ms, end_ms, ' '.join(pieces), offsets))
+            pieces, offsets, length = [], [], 0
+        if not pieces:
+            start_ms = segment['start_ms']
+        else:
+            length += 1  # joining space
+        segment_end_ms = segment.get('end_ms', segment['start_ms'])
+        offsets.append([length, segment['start_ms'], segment_end_ms])
+        pieces.append(text)
+        length += len(text)
+        end_ms = max(end_ms or 0, segment_end_ms)
+    if pieces:
+        windows.append((start_ms, end_ms, ' '.join(pieces), offsets))
+    return windows
+
+def _hit_times(window_start_ms, window_end_ms, offsets_json, highlighted):
+    """Start/end of the segment holding the first match in a window highlighted with chr(1) markers."""
+    if not offsets_json:
+        return window_start_ms, window_end_ms
+    offsets = json.loads(offsets_json)
+    match_offset = max(highlighted.find('\x01'), 0)
+    index = bisect.bisect_right([offset for offset, _, _ in offsets], match_offset) - 1
+    _, start_ms, end_ms = offsets[max(index, 0)]
+    return start_ms, end_ms
+
+def index_result(conn, result):
+    """Add or refresh one successful get_transcript result. Returns False if it was already indexed."""
+    video_id = result['video_id']
+    transcript = result.get('transcript', '')
+    segments = result.get('segments') or []
+    content_hash = hashlib.sha1(transcript.encode('utf-8')).hexdigest()
+
+    existing = conn.execute(
+        "SELECT content_hash, has_timings FROM videos WHERE video_id = ?", (video_id,)
+    ).fetchone()
+    # Skip unchanged transcripts, but let a timed version replace an untimed one
+    if existing and existing['content_hash'] == content_hash and (existing['has_timings'] or not segments):
+        return False
+
+    if segments:
+        windows = build_windows(segments)
+    else:
+        windows = [(None, None, html.unescape(transcript), None)]
+
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        conn.execute("DELETE FROM windows WHERE video_id = ?", (video_id,))
+        conn.executemany(
+            "INSERT INTO windows (video_id, start_ms, end_ms, text, segments) VALUES (?, ?, ?, ?, ?)",
+            [(video_id, start_ms, end_ms, text, json.dumps(offsets) if offsets else None)
+             for start_ms, end_ms, text, offsets in windows]
+        )
+        conn.execute(
+            "INSERT OR REPLACE INTO videos (video_id, language, title, channel, source, content_hash, "
+            "has_timings, window_count, indexed_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (video_id, result.get('language_code') or result.get('language'),
+             result.get('videoTitle') or result.get('title'),
+             result.get('channelTitle') or result.get('channelName'),
+             result.get('source'), content_hash, 1 if segments else 0, len(windows), time.time())
+        )
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+    return True
+
+def index_cache_dir(conn, transcripts_dir):
+    """Backfill the index from the transcripts/ cache (those files carry no timings)."""
+    indexed = skipped = 0
+    for name in sorted(os.listdir(transcripts_dir)):
+        if not name.endswith('.json'):
+            continue
+        try:
+            with open(os.path.join(transcripts_dir, name), 'r', encoding='utf-8') as f:
+                saved = json.load(f)
+        except (OSError, ValueError):
+            skipped += 1
+            continue
+        if not saved.get('transcript'):
+            skipped += 1
+            continue
+        saved['video_id'] = name[:-len('.json')]
+        if index_result(conn, saved):
+            indexed += 1
+        else:
+            skipped += 1
+    return {'indexed': indexed, 'skipped': skipped}
+
+def build_match_query(query):
+    """Quote each term so user input is never parsed as FTS5 syntax; terms are ANDed."""
+    terms = [term.replace('"', '') for term in query.split()]
+    return ' '.join(f'"{term}"' for term in terms if term)
+
+def search(conn, query, limit=20, hits_per_video=5, raw=False):
+    """Rank videos for a query and return their best matching moments.
+
+    Each hit carries the start/end in milliseconds of the caption segment holding the match,
+    or None for both (with 'timed': False) when the video was indexed without timings.
+    """
+    match = query if raw else build_match_query(query)
+    if not match:
+        return []
+
+    # bm25() is lower-is-better, so summing the hits rewards both relevance and frequency
+    ranked = conn.execute(
+        """
+        WITH hits AS MATERIALIZED (
+            SELECT rowid, bm25(windows_fts) AS score FROM windows_fts WHERE windows_fts MATCH ?
+        )
+        SELECT w.video_id, COUNT(*) AS hit_count, SUM(hits.score) AS score
+        FROM hits JOIN windows w ON w.id = hits.rowid
+        GROUP BY w.video_id
+        ORDER BY score
+        LIMIT ?
+        """,
+        (match, limit)
+    ).fetchall()
+    if not ranked:
+        return []
+
+    video_ids = [row['video_id'] for row in ranked]
+    placeholders = ','.join('?' * len(video_ids))
+    hits = {}
+    for row in conn.execute(
+        f"""
+        SELECT w.video_id, w.start_ms, w.end_ms, w.segments, bm25(windows_fts) AS score,
+               snippet(windows_fts, 0, '[', ']', '...', 12) AS snippet,
+               highlight(windows_fts, 0, char(1), char(2)) AS highlighted
+        FROM windows_fts JOIN windows w ON w.id = windows_fts.rowid
+        WHERE windows_fts MATCH ? AND w.video_id IN ({placeholders})
+        ORDER BY score
+        """,
+        [match] + video_ids
+    ):
+        video_hits = hits.setdefault(row['video_id'], [])
+        if len(video_hits) < hits_per_video:
+            start_ms, end_ms = _hit_times(row['start_ms'], row['end_ms'], row['segments'], row['highlighted'])
+            video_hits.append({'start_ms': start_ms, 'end_ms': end_ms, 'timed': start_ms is not None,
+                               'snippet': row['snippet']})
+
+    metadata = {
+        row['video_id']: row for row in conn.execute(
+            f"SELECT video_id, title, channel, language FROM videos WHERE video_id IN ({placeholders})", video_ids
+        )
+    }
+
+    results = []
+    for row in ranked:
+        video = metadata.get(row['video_id'])
+        video_hits = sorted(hits.get(row['video_id'], []), key=lambda hit: hit['start_ms'] or 0)
+        results.append({
+            'video_id': row['video_id'],
+            'score': round(-row['score'], 4),
+            'hit_count': row['hit_count'],
+            'title': video['title'] if video else None,
+            'channel': video['channel'] if video else None,
+            'language': video['language'] if video else None,
+            'hits': video_hits
+        })
+    return results
+
+def get_stats(conn):
+    """Size of the index."""
+    row = conn.execute(
+        "SELECT COUNT(*) AS videos, COALESCE(SUM(window_count), 0) AS windows, "
+        "COALESCE(SUM(has_timings), 0) AS timed FROM videos"
+    ).fetchone()
+    return {'videos': row['videos'], 'windows': row['windows'], 'videos_with_timings': row['timed']}
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Search fetched transcripts')
+    parser.add_argument('--db', default=INDEX_DB_PATH, help='Path to the index database')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    search_parser = subparsers.add_parser('search', help='Find videos and moments mentioning a topic')
+    search_parser.add_argument('query', nargs='+')
+    search_parser.add_argument('--limit', type=int, default=20)
+    search_parser.add_argument('--hits', type=int, default=5, help='Timestamps to return per video')
+    search_parser.add_argument('--raw', action='store_true', help='Pass the query through as FTS5 syntax')
+
+    cache_parser = subparsers.add_parser('index-cache', help='Index transcripts already in the cache directory')
+    cache_parser.add_argument('--dir', default=TRANSCRIPTS_DIR)
+
+    subparsers.add_parser('stats', help='Show index size')
+
+    args = parser.parse_args(argv)
+    conn = connect(args.db)
+
+    if args.command == 'search':
+        try:
+            results = search(conn, ' '.join(args.query), args.limit, args.hits, args.raw)
+        except sqlite3.OperationalError as e:
+            print(json.dumps({'success': False, 'error': f"Invalid query: {e}"}))
+            return 1
+        output = {'success': True, 'results': results}
+    elif args.command == 'index-cache':
+        output = {'success': True, **index_cache_dir(conn, args.dir)}
+    else:
+        output = {'success': True, **get_stats(conn)}
+    print(json.dumps(output))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,388 @@
+#!/usr/bin/env python3
+# transcript_queue.py - Durable SQLite job queue and worker pool for transcript prefetch
+#
+# Usage:
+#   transcript_queue.py enqueue [--interactive | --priority N] VIDEO_ID [VIDEO_ID ...]
+#   transcript_queue.py list [--status queued|running|done|dead] [--limit N]
+#   transcript_queue.py stats [--window SECONDS]
+#   transcript_queue.py drain [--workers N] [--forever]
+#   transcript_queue.py requeue-dead [VIDEO_ID ...]
+
+import os
+import sys
+import json
+import time
+import uuid
+import sqlite3
+import argparse
+import contextlib
+import threading
+
+from transcript_cache import load_cached_transcript, save_transcript_result
+from transcript_fetcher import get_transcript, extract_video_id, debug_print
+from transcript_warmup import warm_up, start_idle_refresher
+
+QUEUE_DB_PATH = os.environ.get(
+    'TRANSCRIPT_QUEUE_DB',
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'transcript_queue.db')
+)
+
+# Lower value runs first
+PRIORITY_INTERACTIVE = 0
+PRIORITY_PREFETCH = 10
+
+DEFAULT_WORKERS = int(os.environ.get('TRANSCRIPT_WORKERS', '4'))
+DEFAULT_MAX_ATTEMPTS = 5
+RETRY_BASE_DELAY = 30        # seconds, doubled per failed attempt
+RETRY_MAX_DELAY = 60 * 60
+LEASE_TIMEOUT = 10 * 60      # running jobs older than this are assumed orphaned
+
+STATUSES = ('queued', 'running', 'done', 'dead')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    video_id TEXT NOT NULL,
+    priority INTEGER NOT NULL,
+    status TEXT NOT NULL DEFAULT 'queued',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL,
+    run_at REAL NOT NULL,
+    enqueued_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL,
+    worker TEXT,
+    source TEXT,
+    last_error TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_ready ON jobs (status, priority, run_at);
+CREATE INDEX IF NOT EXISTS idx_jobs_video ON jobs (video_id, status);
+CREATE INDEX IF NOT EXISTS idx_jobs_finished ON jobs (finished_at);
+"""
+
+def connect(db_path=None):
+    """Open a queue connection; each worker thread needs its own."""
+    db_path = db_path or QUEUE_DB_PATH
+    os.makedirs(os.path.dirname(db_path), exist_ok=True)
+    conn = sqlite3.connect(db_path, timeout=30, isolation_level=None)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.executescript(SCHEMA)
+    return conn
+
+def retry_delay(attempts):
+    """Exponential backoff for the given number of failed attempts."""
+    return min(RETRY_BASE_DELAY * (2 ** max(attempts - 1, 0)), RETRY_MAX_DELAY)
+
+def enqueue(conn, video_id, priority=PRIORITY_PREFETCH, max_attempts=DEFAULT_MAX_ATTEMPTS):
+    """Queue a video, or raise the priority of its pending job. Returns the job ID."""
+    now = time.time()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        row = conn.execute(
+            "SELECT id, priority, status FROM jobs WHERE video_id = ? AND status IN ('queued', 'running') "
+            "ORDER BY id LIMIT 1",
+            (video_id,)
+        ).fetchone()
+        if row:
+            # An interactive request for a video already waiting as prefetch jumps the line
+            if row['status'] == 'queued' and priority < row['priority']:
+                conn.execute(
+                    "UPDATE jobs SET priority = ?, run_at = MIN(run_at, ?) WHERE id = ?",
+                    (priority, now, row['id'])
+                )
+            job_id = row['id']
+        else:
+            cursor = conn.execute(
+                "INSERT INTO jobs (video_id, priority, max_attempts, run_at, enqueued_at) VALUES (?, ?, ?, ?, ?)",
+                (video_id, priority, max_attempts, now, now)
+            )
+            job_id = cursor.lastrowid
+        conn.execute("COMMIT")
+        return job_id
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+
+def claim_job(conn, worker_name):
+    """Atomically take the next ready job, reclaiming expired leases. Returns a row or None."""
+    now = time.time()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        # An orphaned lease used up an attempt too, so a job that keeps killing its worker still dead-letters
+        conn.execute(
+            "UPDATE jobs SET status = 'dead', finished_at = ?, last_error = ? "
+            "WHERE status = 'running' AND started_at < ? AND attempts >= max_attempts",
+            (now, 'Lease expired on the final attempt', now - LEASE_TIMEOUT)
+        )
+        conn.execute(
+            "UPDATE jobs SET status = 'queued', run_at = ? WHERE status = 'running' AND started_at < ?",
+            (now, now - LEASE_TIMEOUT)
+        )
+        row = conn.execute(
+            "SELECT * FROM jobs WHERE status = 'queued' AND run_at <= ? ORDER BY priority, run_at, id LIMIT 1",
+            (now,)
+        ).fetchone()
+        if row is None:
+            conn.execute("COMMIT")
+            return None
+        conn.execute(
+            "UPDATE jobs SET status = 'running', attempts = attempts + 1, started_at = ?, worker = ? WHERE id = ?",
+            (now, worker_name, row['id'])
+        )
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+    return conn.execute("SELECT * FROM jobs WHERE id = ?", (row['id'],)).fetchone()
+
+def complete_job(conn, job_id, source=None):
+    """Mark a job as done."""
+    conn.execute(
+        "UPDATE jobs SET status = 'done', finished_at = ?, source = ?, last_error = NULL WHERE id = ?",
+        (time.time(), source, job_id)
+    )
+
+def fail_job(conn, job, error):
+    """Schedule a retry with backoff, or dead-letter the job once it is out of attempts."""
+    now = time.time()
+    if job['attempts'] >= job['max_attempts']:
+        conn.execute(
+            "UPDATE jobs SET status = 'dead', finished_at = ?, last_error = ? WHERE id = ?",
+            (now, error, job['id'])
+        )
+        return 'dead'
+    conn.execute(
+        "UPDATE jobs SET status = 'queued', run_at = ?, last_error = ? WHERE id = ?",
+        (now + retry_delay(job['attempts']), error, job['id'])
+    )
+    return 'queued'
+
+def requeue_dead(conn, video_ids=None):
+    """Move dead-lettered jobs back into the queue with a fresh attempt budget."""
+    now = time.time()
+    query = "UPDATE jobs SET status = 'queued', attempts = 0, run_at = ?, finished_at = NULL WHERE status = 'dead'"
+    params = [now]
+    if video_ids:
+        query += f" AND video_id IN ({','.join('?' * len(video_ids))})"
+        params.extend(video_ids)
+    return conn.execute(query, params).rowcount
+
+def list_jobs(conn, status=None, limit=50):
+    """List jobs in the order workers would pick them up."""
+    if status:
+        rows = conn.execute(
+            "SELECT * FROM jobs WHERE status = ? ORDER BY priority, run_at, id LIMIT ?", (status, limit)
+        ).fetchall()
+    else:
+        rows = conn.execute("SELECT * FROM jobs ORDER BY id DESC LIMIT ?", (limit,)).fetchall()
+    return [dict(row) for row in rows]
+
+def _percentile(sorted_values, fraction):
+    if not sorted_values:
+        return None
+    index = min(int(round(fraction * (len(sorted_values) - 1))), len(sorted_values) - 1)
+    return sorted_values[index]
+
+def get_stats(conn, window=3600):
+    """Queue depth per status plus throughput and queue latency over the last `window` seconds."""
+    now = time.time()
+    counts = {status: 0 for status in STATUSES}
+    for row in conn.execute("SELECT status, COUNT(*) AS n FROM jobs GROUP BY status"):
+        counts[row['status']] = row['n']
+
+    ready = conn.execute(
+        "SELECT priority, COUNT(*) AS n, MIN(enqueued_at) AS oldest FROM jobs "
+        "WHERE status = 'queued' AND run_at <= ? GROUP BY priority",
+        (now,)
+    ).fetchall()
+
+    finished = conn.execute(
+        "SELECT status, enqueued_at, started_at, finished_at FROM jobs "
+        "WHERE status IN ('done', 'dead') AND finished_at >= ?",
+        (now - window,)
+    ).fetchall()
+    done = [row for row in finished if row['status'] == 'done']
+    # Queue latency: time from enqueue until the successful attempt started (includes retry waits)
+    latencies = sorted(row['started_at'] - row['enqueued_at'] for row in done)
+    fetch_times = sorted(row['finished_at'] - row['started_at'] for row in done)
+
+    def summarize(values):
+        if not values:
+            return None
+        return {
+            'avg': round(sum(values) / len(values), 3),
+            'p50': round(_percentile(values, 0.5), 3),
+            'p95': round(_percentile(values, 0.95), 3),
+            'max': round(values[-1], 3)
+        }
+
+    return {
+        'counts': counts,
+        'ready_by_priority': {
+            str(row['priority']): {'count': row['n'], 'oldest_wait': round(now - row['oldest'], 3)}
+            for row in ready
+        },
+        'window_seconds': window,
+        'completed': len(done),
+        'dead_lettered': len(finished) - len(done),
+        'throughput_per_minute': round(len(done) / (window / 60.0), 3),
+        'queue_latency': summarize(latencies),
+        'fetch_time': summarize(fetch_times)
+    }
+
+def process_job(conn, job, fetch_fn):
+    """Run one claimed job, storing a successful transcript in the cache."""
+    video_id = job['video_id']
+    cached = load_cached_transcript(video_id)
+    if cached:
+        complete_job(conn, job['id'], source='cache')
+        return 'done'
+
+    try:
+        result = fetch_fn(video_id)
+    except Exception as e:
+        result = {'success': False, 'error': f"{type(e).__name__}: {e}"}
+
+    if result.get('success'):
+        result.setdefault('video_id', video_id)
+        try:
+            save_transcript_result(result)
+        except OSError as e:
+            # A full or read-only cache must not leave the job stuck in 'running' until its lease expires
+            return fail_job(conn, job, f"Could not save transcript: {e}")
+        complete_job(conn, job['id'], source=result.get('source'))
+        return 'done'
+    return fail_job(conn, job, str(result.get('error', 'Unknown error')))
+
+def _worker_loop(db_path, worker_name, fetch_fn, stop_event, stop_when_empty, poll_interval, counters, lock,
+                 warm=False):
+    if warm:
+        warmup = warm_up()
+        debug_print(f"[{worker_name}] warm-up {warmup['state']}: {json.dumps(warmup['connections'])}")
+    conn = connect(db_path)
+    try:
+        while not stop_event.is_set():
+            job = claim_job(conn, worker_name)
+            if job is None:
+                if stop_when_empty:
+                    return
+                stop_event.wait(poll_interval)
+                continue
+            outcome = process_job(conn, job, fetch_fn)
+            with lock:
+                counters[outcome] = counters.get(outcome, 0) + 1
+            debug_print(f"[{worker_name}] {job['video_id']} attempt {job['attempts']} -> {outcome}")
+    finally:
+        conn.close()
+
+def drain(num_workers=DEFAULT_WORKERS, fetch_fn=None, db_path=None, stop_when_empty=True, poll_interval=2.0,
+          stop_event=None):
+    """Run a pool of fetcher threads against the queue and return a summary of what they did.
+
+    With stop_when_empty the pool exits once no job is ready; jobs waiting on a retry
+    backoff stay queued for a later drain.
+    """
+    # Real fetches pre-connect each worker thread's sessions and keep them alive between jobs
+    warm = fetch_fn is None
+    fetch_fn = fetch_fn or get_transcript
+    if warm:
+        start_idle_refresher()
+
+    stop_event = stop_event or threading.Event()
+    counters = {}
+    lock = threading.Lock()
+    run_id = uuid.uuid4().hex[:6]
+    started = time.time()
+
+    threads = []
+    for i in range(max(1, num_workers)):
+        thread = threading.Thread(
+            target=_worker_loop,
+            args=(db_path, f"worker-{run_id}-{i}", fetch_fn, stop_event, stop_when_empty, poll_interval,
+                  counters, lock, warm),
+            daemon=True
+        )
+        thread.start()
+        threads.append(thread)
+
+    try:
+        for thread in threads:
+            while thread.is_alive():
+                thread.join(0.5)
+    except KeyboardInterrupt:
+        stop_event.set()
+        for thread in threads:
+            thread.join()
+
+    elapsed = time.time() - started
+    processed = sum(counters.values())
+    return {
+        'success': True,
+        'workers': len(threads),
+        'elapsed_seconds': round(elapsed, 3),
+        'processed': processed,
+        'done': counters.get('done', 0),
+        'retry_scheduled': counters.get('queued', 0),
+        'dead_lettered': counters.get('dead', 0),
+        'jobs_per_second': round(processed / elapsed, 3) if elapsed > 0 else 0.0
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Transcript prefetch job queue')
+    parser.add_argument('--db', default=QUEUE_DB_PATH, help='Path to the queue database')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    enqueue_parser = subparsers.add_parser('enqueue', help='Queue videos for fetching')
+    enqueue_parser.add_argument('video_ids', nargs='+')
+    priority_group = enqueue_parser.add_mutually_exclusive_group()
+    priority_group.add_argument('--interactive', action='store_true', help='Run ahead of background prefetch')
+    priority_group.add_argument('--priority', type=int, default=PRIORITY_PREFETCH)
+    enqueue_parser.add_argument('--max-attempts', type=int, default=DEFAULT_MAX_ATTEMPTS)
+
+    list_parser = subparsers.add_parser('list', help='Inspect jobs')
+    list_parser.add_argument('--status', choices=STATUSES)
+    list_parser.add_argument('--limit', type=int, default=50)
+
+    stats_parser = subparsers.add_parser('stats', help='Show queue depth, throughput and latency')
+    stats_parser.add_argument('--window', type=int, default=3600, help='Seconds of history to report on')
+
+    drain_parser = subparsers.add_parser('drain', help='Run fetcher workers against the queue')
+    drain_parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS)
+    drain_parser.add_argument('--forever', action='store_true', help='Keep polling once the queue is empty')
+    drain_parser.add_argument('--poll-interval', type=float, default=2.0)
+
+    requeue_parser = subparsers.add_parser('requeue-dead', help='Retry dead-lettered jobs')
+    requeue_parser.add_argument('video_ids', nargs='*')
+
+    args = parser.parse_args(argv)
+
+    if args.command == 'drain':
+        # Keep fetcher logging (proxy status, debug output) out of the JSON written to stdout
+        with contextlib.redirect_stdout(sys.stderr):
+            output = drain(args.workers, db_path=args.db, stop_when_empty=not args.forever,
+                           poll_interval=args.poll_interval)
+        output['stats'] = get_stats(connect(args.db))
+        print(json.dumps(output))
+        return 0
+
+    conn = connect(args.db)
+    if args.command == 'enqueue':
+        priority = PRIORITY_INTERACTIVE if args.interactive else args.priority
+        jobs = {}
+        for video_id in args.video_ids:
+            video_id = extract_video_id(video_id)
+            jobs[video_id] = enqueue(conn, video_id, priority=priority, max_attempts=args.max_attempts)
+        output = {'success': True, 'jobs': jobs}
+    elif args.command == 'list':
+        output = {'success': True, 'jobs': list_jobs(conn, args.status, args.limit)}
+    elif args.command == 'stats':
+        output = {'success': True, **get_stats(conn, args.window)}
+    else:
+        output = {'success': True, 'requeued': requeue_dead(conn, args.video_ids)}
+    print(json.dumps(output))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
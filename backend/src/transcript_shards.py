@@ -0,0 +1,413 @@
+#!/usr/bin/env python3
+# transcript_shards.py - Supervisor that shards transcript fetches over worker processes by consistent hashing
+#
+# Each worker process is bound to one proxy/cookie identity from config.proxy_config and
+# keeps its own warm session and result cache. A video ID always maps to the same worker
+# while that worker is healthy, so retries and repeat requests reuse the same identity.
+#
+# Usage:
+#   transcript_shards.py [--workers N] [--grace SECONDS] [--fetch-target MODULE:FUNCTION] fetch VIDEO_ID [VIDEO_ID ...]
+#   transcript_shards.py [--workers N] [--grace SECONDS] [--fetch-target MODULE:FUNCTION] serve
+#       (one video ID per stdin line, one JSON result per stdout line; "stats" prints per-worker load)
+
+import os
+import sys
+import json
+import time
+import queue
+import bisect
+import hashlib
+import argparse
+import threading
+import itertools
+import multiprocessing
+from collections import OrderedDict
+from concurrent.futures import Future
+
+DEFAULT_WORKERS = int(os.environ.get('TRANSCRIPT_WORKERS', '4'))
+VIRTUAL_NODES = 64              # ring points per worker
+LOCAL_CACHE_SIZE = 256          # successful results kept in each worker's memory
+UNHEALTHY_AFTER_FAILURES = 3    # consecutive identity-related failures before a worker is taken off the ring
+UNHEALTHY_COOLDOWN = 120        # seconds before an unhealthy worker is put back on the ring
+HEALTH_CHECK_INTERVAL = 1.0
+DEFAULT_FETCH_TARGET = 'transcript_fetcher:get_transcript'
+
+# Error kinds from get_transcript (see transcript_fetcher.classify_error) that point at the
+# proxy/cookie identity rather than the video itself
+IDENTITY_ERROR_KINDS = ('blocked', 'network')
+# Fallback for results without an error_kind (other fetch targets, exceptions in the worker)
+IDENTITY_ERROR_MARKERS = ('429', '403', 'Too Many Requests', 'forbidden', 'blocking', 'Network error',
+                          'ProxyError', 'timed out', 'Connection')
+
+class HashRing:
+    """Consistent hash ring with virtual nodes."""
+
+    def __init__(self, nodes=(), virtual_nodes=VIRTUAL_NODES):
+        self.virtual_nodes = virtual_nodes
+        self._keys = []
+        self._points = {}
+        for node in nodes:
+            self.add(node)
+
+    @staticmethod
+    def _hash(value):
+        return int.from_bytes(hashlib.md5(value.encode('utf-8')).digest()[:8], 'big')
+
+    def add(self, node):
+        for i in range(self.virtual_nodes):
+            point = self._hash(f"{node}#{i}")
+            self._points[point] = node
+            bisect.insort(self._keys, point)
+
+    def remove(self, node):
+        for i in range(self.virtual_nodes):
+            point = self._hash(f"{node}#{i}")
+            if self._points.pop(point, None) is not None:
+                self._keys.pop(bisect.bisect_left(self._keys, point))
+
+    def preference_list(self, key):
+        """All nodes in ring order starting from the key's owner."""
+        if not self._keys:
+            return []
+        start = bisect.bisect(self._keys, self._hash(key)) % len(self._keys)
+        nodes = []
+        for point in itertools.chain(self._keys[start:], self._keys[:start]):
+            node = self._points[point]
+            if node not in nodes:
+                nodes.append(node)
+        return nodes
+
+def _is_identity_error(result):
+    """Whether a failed result should be retried under another identity."""
+    if result.get('error_kind'):
+        return result['error_kind'] in IDENTITY_ERROR_KINDS
+    error = str(result.get('error') or '')
+    return any(marker.lower() in error.lower() for marker in IDENTITY_ERROR_MARKERS)
+
+def _load_fetch_function(fetch_target):
+    module_name, function_name = fetch_target.split(':')
+    module = __import__(module_name, fromlist=[function_name])
+    return getattr(module, function_name)
+
+def _worker_main(name, identity, fetch_target, task_queue, result_queue):
+    """Worker process: bind to an identity, then fetch video IDs from its task queue until None."""
+    # Workers inherit the supervisor's stdout, which carries the JSON protocol in the CLI;
+    # anything the fetcher prints (proxy status, debug output) goes to stderr instead
+    sys.stdout = sys.stderr
+    from config.proxy_config import set_active_identity
+    set_active_identity(identity)
+    fetch_fn = _load_fetch_function(fetch_target)
+    from transcript_cache import save_transcript_result
+    if fetch_target == DEFAULT_FETCH_TARGET:
+        # Connect through this worker's proxy before the first job arrives
+        from transcript_warmup import warm_up, start_idle_refresher
+        warm_up()
+        start_idle_refresher()
+
+    local_cache = OrderedDict()
+    while True:
+        task = task_queue.get()
+        if task is None:
+            return
+        job_id, video_id = task
+        started = time.time()
+        result = local_cache.get(video_id)
+        if result is not None:
+            local_cache.move_to_end(video_id)
+            result = {**result, 'cached': True}
+        else:
+            try:
+                result = fetch_fn(video_id)
+            except Exception as e:
+                result = {'success': False, 'error': f"{type(e).__name__}: {e}", 'video_id': video_id}
+            if result.get('success'):
+                try:
+                    save_transcript_result(result)
+                except OSError:
+                    pass
+                local_cache[video_id] = result
+                if len(local_cache) > LOCAL_CACHE_SIZE:
+                    local_cache.popitem(last=False)
+        result_queue.put((job_id, name, time.time() - started, result))
+
+class _Worker:
+    def __init__(self, name, identity):
+        self.name = name
+        self.identity = identity
+        self.process = None
+        self.tasks = None
+        self.in_flight = {}
+        self.healthy = True
+        self.unhealthy_since = None
+        self.consecutive_failures = 0
+        self.assigned = 0
+        self.completed = 0
+        self.failed = 0
+        self.restarts = 0
+        self.busy_seconds = 0.0
+
+class ShardSupervisor:
+    """Starts N fetcher processes and routes each video ID to one of them by consistent hashing.
+
+    fetch_target names the fetch function as "module:function" so spawned workers can import it.
+    """
+
+    def __init__(self, num_workers=DEFAULT_WORKERS, identities=None, fetch_target=DEFAULT_FETCH_TARGET):
+        if identities is None:
+            from config.proxy_config import get_proxy_identities
+            identities = get_proxy_identities(num_workers)
+        self._context = multiprocessing.get_context('spawn')
+        self._results = self._context.Queue()
+        self._fetch_target = fetch_target
+        self._workers = OrderedDict(
+            (f"worker-{i}", _Worker(f"worker-{i}", identities[i % len(identities)])) for i in range(num_workers)
+        )
+        self._ring = HashRing(self._workers)
+        self._lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)
+        self._jobs = {}
+        self._job_ids = itertools.count(1)
+        self._closing = False            # no new submissions
+        self._workers_stopping = False   # sentinels sent; crashed workers are no longer restarted
+        self._stopping = threading.Event()
+        self._threads = []
+
+    def start(self):
+        for worker in self._workers.values():
+            self._spawn(worker)
+        for target in (self._collect_results, self._monitor_health):
+            thread = threading.Thread(target=target, daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        return self
+
+    def _spawn(self, worker):
+        worker.tasks = self._context.Queue()
+        worker.process = self._context.Process(
+            target=_worker_main,
+            args=(worker.name, worker.identity, self._fetch_target, worker.tasks, self._results),
+            name=f"transcript-{worker.name}", daemon=True
+        )
+        worker.process.start()
+
+    def _route(self, video_id, exclude=()):
+        """Owner of a video among healthy workers, falling back to any worker if none are healthy."""
+        candidates = [name for name in self._ring.preference_list(video_id) if name not in exclude]
+        for name in candidates:
+            if self._workers[name].healthy:
+                return self._workers[name]
+        return self._workers[candidates[0]] if candidates else None
+
+    # The methods below run with self._lock held. Finished jobs are appended to `resolved`
+    # and their futures are set only after the lock is released, so done-callbacks never
+    # run under the supervisor lock.
+
+    def _dispatch(self, job_id, resolved):
+        job = self._jobs[job_id]
+        worker = self._route(job['video_id'], exclude=job['tried'])
+        if worker is None:
+            self._finish(job_id, {'success': False, 'error': 'All fetcher workers failed for this video',
+                                  'video_id': job['video_id'], 'workers_tried': job['tried']}, resolved)
+            return
+        job['worker'] = worker.name
+        worker.in_flight[job_id] = job['video_id']
+        worker.assigned += 1
+        worker.tasks.put((job_id, job['video_id']))
+
+    def _finish(self, job_id, result, resolved):
+        job = self._jobs.pop(job_id)
+        resolved.append((job['future'], result))
+        if not self._jobs:
+            self._idle.notify_all()
+
+    @staticmethod
+    def _resolve(resolved):
+        for future, result in resolved:
+            future.set_result(result)
+
+    def submit(self, video_id):
+        """Queue a fetch and return a Future resolving to the get_transcript result."""
+        future = Future()
+        resolved = []
+        with self._lock:
+            if self._closing:
+                raise RuntimeError('Supervisor is shutting down')
+            job_id = next(self._job_ids)
+            self._jobs[job_id] = {'video_id': video_id, 'future': future, 'tried': [], 'worker': None}
+            self._dispatch(job_id, resolved)
+        self._resolve(resolved)
+        return future
+
+    def fetch_many(self, video_ids):
+        futures = [self.submit(video_id) for video_id in video_ids]
+        return [future.result() for future in futures]
+
+    def _mark_unhealthy(self, worker):
+        if worker.healthy:
+            worker.healthy = False
+            worker.unhealthy_since = time.time()
+
+    def _handle_result(self, job_id, name, elapsed, result, resolved):
+        worker = self._workers[name]
+        worker.in_flight.pop(job_id, None)
+        worker.busy_seconds += elapsed
+        job = self._jobs.get(job_id)
+        if job is None:
+            return
+        result['worker'] = name
+        if result.get('success'):
+            worker.completed += 1
+            worker.consecutive_failures = 0
+            self._finish(job_id, result, resolved)
+            return
+
+        worker.failed += 1
+        if not _is_identity_error(result):
+            # The video itself has no usable transcript; another identity will not help
+            self._finish(job_id, result, resolved)
+            return
+        worker.consecutive_failures += 1
+        if worker.consecutive_failures >= UNHEALTHY_AFTER_FAILURES:
+            self._mark_unhealthy(worker)
+        job['tried'].append(name)
+        if len(job['tried']) >= len(self._workers):
+            self._finish(job_id, result, resolved)
+        else:
+            self._dispatch(job_id, resolved)
+
+    def _collect_results(self):
+        # Keep draining after stop() is requested until the result queue is empty
+        while True:
+            try:
+                job_id, name, elapsed, result = self._results.get(timeout=0.5)
+            except queue.Empty:
+                if self._stopping.is_set():
+                    return
+                continue
+            resolved = []
+            with self._lock:
+                self._handle_result(job_id, name, elapsed, result, resolved)
+            self._resolve(resolved)
+
+    def _monitor_health(self):
+        while not self._stopping.wait(HEALTH_CHECK_INTERVAL):
+            resolved = []
+            with self._lock:
+                if self._workers_stopping:
+                    continue
+                now = time.time()
+                for worker in self._workers.values():
+                    if not worker.process.is_alive():
+                        # Crashed: reroute what it held, then restart it with the same identity
+                        orphaned = list(worker.in_flight)
+                        worker.in_flight.clear()
+                        worker.restarts += 1
+                        self._mark_unhealthy(worker)
+                        self._spawn(worker)
+                        for job_id in orphaned:
+                            if job_id in self._jobs:
+                                self._jobs[job_id]['tried'].append(worker.name)
+                                self._dispatch(job_id, resolved)
+                    elif not worker.healthy and now - worker.unhealthy_since >= UNHEALTHY_COOLDOWN:
+                        worker.healthy = True
+                        worker.unhealthy_since = None
+                        worker.consecutive_failures = 0
+            self._resolve(resolved)
+
+    def stats(self):
+        """Per-worker load and health."""
+        with self._lock:
+            return {
+                name: {
+                    'identity': worker.identity.get('name'),
+                    'pid': worker.process.pid if worker.process else None,
+                    'healthy': worker.healthy,
+                    'in_flight': len(worker.in_flight),
+                    'assigned': worker.assigned,
+                    'completed': worker.completed,
+                    'failed': worker.failed,
+                    'restarts': worker.restarts,
+                    'avg_fetch_seconds': round(worker.busy_seconds / max(worker.completed + worker.failed, 1), 3)
+                }
+                for name, worker in self._workers.items()
+            }
+
+    def stop(self, grace_period=None):
+        """Wait for outstanding jobs (up to grace_period seconds, None = no limit), then shut the workers down.
+
+        Jobs still unfinished after the grace period resolve with an error instead of hanging.
+        """
+        resolved = []
+        with self._lock:
+            self._closing = True
+            deadline = None if grace_period is None else time.time() + grace_period
+            while self._jobs:
+                remaining = None if deadline is None else deadline - time.time()
+                if remaining is not None and remaining <= 0:
+                    break
+                self._idle.wait(remaining)
+            for job_id in list(self._jobs):
+                self._finish(job_id, {'success': False, 'error': 'Fetcher supervisor shut down before completion',
+                                      'video_id': self._jobs[job_id]['video_id']}, resolved)
+            self._workers_stopping = True
+        self._resolve(resolved)
+
+        for worker in self._workers.values():
+            if worker.process and worker.process.is_alive():
+                worker.tasks.put(None)
+        for worker in self._workers.values():
+            if worker.process:
+                # Workers exit after their current fetch; only force them if the grace period ran out
+                worker.process.join(None if grace_period is None else max(grace_period, 5))
+                if worker.process.is_alive():
+                    worker.process.terminate()
+        self._stopping.set()
+        for thread in self._threads:
+            thread.join()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Sharded transcript fetcher supervisor')
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS)
+    parser.add_argument('--grace', type=float, default=None,
+                        help='Seconds to wait for outstanding fetches on shutdown (default: no limit)')
+    parser.add_argument('--fetch-target', default=DEFAULT_FETCH_TARGET,
+                        help='module:function each worker calls per video (default: %(default)s)')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    fetch_parser = subparsers.add_parser('fetch', help='Fetch the given videos and report per-worker load')
+    fetch_parser.add_argument('video_ids', nargs='+')
+
+    subparsers.add_parser('serve', help='Read video IDs from stdin, write JSON results to stdout')
+
+    args = parser.parse_args(argv)
+    supervisor = ShardSupervisor(args.workers, fetch_target=args.fetch_target).start()
+    try:
+        if args.command == 'fetch':
+            results = supervisor.fetch_many(args.video_ids)
+            for result in results:
+                result.pop('segments', None)
+            print(json.dumps({'success': True, 'results': results, 'workers': supervisor.stats()}))
+        else:
+            output_lock = threading.Lock()
+
+            def emit(payload):
+                with output_lock:
+                    print(json.dumps(payload), flush=True)
+
+            def emit_result(future):
+                result = future.result()
+                result.pop('segments', None)
+                emit(result)
+
+            for line in sys.stdin:
+                video_id = line.strip()
+                if video_id == 'stats':
+                    emit({'success': True, 'workers': supervisor.stats()})
+                elif video_id:
+                    supervisor.submit(video_id).add_done_callback(emit_result)
+    finally:
+        supervisor.stop(args.grace)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
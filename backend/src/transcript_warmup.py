@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+# transcript_warmup.py - Shared HTTP sessions for the fetcher, warm-up on worker start and idle refresh
+#
+# youtube_transcript_api 0.6.1 opens a new requests.Session for every list_transcripts call,
+# so each fetch paid DNS, proxy CONNECT and TLS again. The fetcher now takes its sessions
+# from this pool, which lets a worker pre-connect them once at start and keep them alive.
+#
+# Warm-up pays off in the long-lived workers (transcript_queue.py drain, transcript_shards.py).
+# The Node routes spawn a fresh transcript_fetcher.py per request, which still starts cold;
+# `transcript_fetcher.py --health` warms only its own short-lived process and reports the result.
+#
+# Sessions are pooled per thread as well as per proxy: requests.Session and its cookie jar are
+# not meant to be shared by concurrent fetches, and each drain() thread warms its own.
+
+import os
+import time
+import socket
+import threading
+from urllib.parse import urlparse
+
+import requests
+
+try:
+    from config.proxy_config import get_proxy_config
+except ImportError:
+    def get_proxy_config():
+        return None
+
+YOUTUBE_HOSTS = ['www.youtube.com']
+WARMUP_URL = os.environ.get('TRANSCRIPT_WARMUP_URL', 'https://www.youtube.com/generate_204')
+WARMUP_TIMEOUT = float(os.environ.get('TRANSCRIPT_WARMUP_TIMEOUT', '10'))
+# Proxies and YouTube drop idle keep-alive connections after roughly 1-2 minutes
+REFRESH_INTERVAL = float(os.environ.get('TRANSCRIPT_REFRESH_INTERVAL', '60'))
+
+_sessions = {}
+_sessions_lock = threading.Lock()
+_refresher = None
+
+_status = {
+    'state': 'cold',
+    'started_at': None,
+    'completed_at': None,
+    'dns': {},
+    'connections': {},
+    'last_refresh': None,
+    'refreshes': 0
+}
+_status_lock = threading.Lock()
+
+def _proxy_key(proxies):
+    return proxies['https'] if proxies else None
+
+def _redact(proxy_url):
+    if not proxy_url:
+        return 'direct'
+    parsed = urlparse(proxy_url)
+    return f"{parsed.hostname}:{parsed.port}"
+
+def get_http_session(proxies=None):
+    """This thread's pooled requests session for a proxy configuration (None = direct connection)."""
+    key = (threading.get_ident(), _proxy_key(proxies))
+    with _sessions_lock:
+        entry = _sessions.get(key)
+        if entry is None:
+            session = requests.Session()
+            session.proxies = dict(proxies) if proxies else {}
+            entry = _sessions[key] = {'session': session, 'last_used': 0.0}
+        entry['last_used'] = time.time()
+        return entry['session']
+
+def resolve_hosts(hosts):
+    """Resolve each host once so the first fetch does not wait on DNS. Returns per-host results."""
+    results = {}
+    for host, port in hosts:
+        started = time.time()
+        try:
+            addresses = socket.getaddrinfo(host, port, type=socket.SOCK_STREAM)
+            results[host] = {'ok': True, 'ms': round((time.time() - started) * 1000, 1), 'addresses': len(addresses)}
+        except OSError as e:
+            results[host] = {'ok': False, 'ms': round((time.time() - started) * 1000, 1), 'error': str(e)}
+    return results
+
+def preconnect(session, timeout=WARMUP_TIMEOUT):
+    """Open (or re-open) the session's pooled connection to YouTube through its proxy."""
+    started = time.time()
+    try:
+        response = session.get(WARMUP_URL, timeout=timeout, allow_redirects=False)
+        response.close()
+        return {'ok': response.status_code < 500, 'status': response.status_code,
+                'ms': round((time.time() - started) * 1000, 1)}
+    except requests.RequestException as e:
+        return {'ok': False, 'error': str(e), 'ms': round((time.time() - started) * 1000, 1)}
+
+def warm_up(timeout=WARMUP_TIMEOUT):
+    """Resolve the proxy and YouTube hosts, then pre-create and pre-connect this thread's
+    proxied and direct sessions."""
+    with _status_lock:
+        _status.update({'state': 'warming', 'started_at': time.time(), 'completed_at': None})
+
+    proxies = get_proxy_config()
+    hosts = [(host, 443) for host in YOUTUBE_HOSTS]
+    if proxies:
+        parsed = urlparse(proxies['https'])
+        hosts.insert(0, (parsed.hostname, parsed.port or 80))
+    dns = resolve_hosts(hosts)
+
+    connections = {}
+    for session_proxies in ([proxies] if proxies else []) + [None]:
+        session = get_http_session(session_proxies)
+        connections[_redact(_proxy_key(session_proxies))] = preconnect(session, timeout)
+
+    # Warm means the path the fetcher tries first (proxy when enabled) is connected
+    primary = connections[_redact(_proxy_key(proxies))]
+    with _status_lock:
+        _status.update({
+            'state': 'warm' if primary['ok'] else 'degraded',
+            'completed_at': time.time(),
+            'dns': dns,
+            'connections': connections
+        })
+    return get_warmup_status()
+
+def refresh_idle_sessions(max_idle=REFRESH_INTERVAL):
+    """Re-touch sessions unused for max_idle seconds so their pooled connections do not expire.
+
+    Sessions of threads that have exited are closed and dropped instead. A session idle that
+    long sits between jobs, and the urllib3 pool underneath it is thread-safe, so touching it
+    from the refresher thread does not disturb its owner.
+    """
+    now = time.time()
+    alive = {thread.ident for thread in threading.enumerate()}
+    with _sessions_lock:
+        for key in [key for key in _sessions if key[0] not in alive]:
+            _sessions.pop(key)['session'].close()
+        idle = [(key, entry) for key, entry in _sessions.items() if now - entry['last_used'] >= max_idle]
+    results = {}
+    for (_, proxy_key), entry in idle:
+        results[_redact(proxy_key)] = preconnect(entry['session'])
+        entry['last_used'] = time.time()
+    with _status_lock:
+        _status['last_refresh'] = now
+        _status['refreshes'] += 1
+        _status['connections'].update(results)
+    return results
+
+def _refresh_loop(interval, stop_event):
+    while not stop_event.wait(interval):
+        refresh_idle_sessions(interval)
+
+def start_idle_refresher(interval=REFRESH_INTERVAL):
+    """Start (once per process) a daemon thread that keeps idle sessions connected."""
+    global _refresher
+    with _sessions_lock:
+        if _refresher is None:
+            stop_event = threading.Event()
+            thread = threading.Thread(target=_refresh_loop, args=(interval, stop_event),
+                                      name='transcript-session-refresher', daemon=True)
+            thread.start()
+            _refresher = (thread, stop_event)
+    return _refresher[0]
+
+def get_warmup_status():
+    """Copy of the warm-up state for health output."""
+    with _status_lock:
+        status = dict(_status)
+        status['dns'] = dict(_status['dns'])
+        status['connections'] = dict(_status['connections'])
+    with _sessions_lock:
+        status['sessions'] = len(_sessions)
+    return status
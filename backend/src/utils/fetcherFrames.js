@@ -0,0 +1,115 @@
+const { spawn } = require('child_process');
+const zlib = require('zlib');
+
+/**
+ * Decoder for the length-prefixed frames written by transcript_fetcher.py --framed
+ * (layout documented in src/transcript_framing.py):
+ *   'TRF1' | header length (u32 BE) | body length (u32 BE) | JSON header | body
+ */
+const MAGIC = Buffer.from('TRF1');
+const PREFIX_LENGTH = 12;
+
+class FrameDecoder {
+  constructor() {
+    this.chunks = [];
+    this.buffered = 0;
+  }
+
+  /**
+   * Feed a chunk of stdout and get back every result completed by it
+   */
+  push(chunk) {
+    this.chunks.push(chunk);
+    this.buffered += chunk.length;
+    const results = [];
+
+    while (this.buffered >= PREFIX_LENGTH) {
+      const prefix = this._peek(PREFIX_LENGTH);
+      if (!prefix.subarray(0, 4).equals(MAGIC)) {
+        throw new Error(`Bad frame magic: ${prefix.subarray(0, 4).toString('hex')}`);
+      }
+      const headerLength = prefix.readUInt32BE(4);
+      const bodyLength = prefix.readUInt32BE(8);
+      const frameLength = PREFIX_LENGTH + headerLength + bodyLength;
+      if (this.buffered < frameLength) break;
+
+      const frame = this._take(frameLength);
+      const header = JSON.parse(frame.toString('utf8', PREFIX_LENGTH, PREFIX_LENGTH + headerLength));
+      results.push(decodeResult(header, frame.subarray(PREFIX_LENGTH + headerLength)));
+    }
+    return results;
+  }
+
+  _peek(length) {
+    if (this.chunks[0].length < length) {
+      this.chunks = [Buffer.concat(this.chunks)];
+    }
+    return this.chunks[0].subarray(0, length);
+  }
+
+  _take(length) {
+    // One concat per frame at most; a frame inside a single chunk is sliced without copying
+    if (this.chunks[0].length < length) {
+      this.chunks = [Buffer.concat(this.chunks)];
+    }
+    const frame = this.chunks[0].subarray(0, length);
+    const rest = this.chunks[0].subarray(length);
+    this.chunks = rest.length ? [rest, ...this.chunks.slice(1)] : this.chunks.slice(1);
+    this.buffered -= length;
+    return frame;
+  }
+}
+
+/**
+ * Rebuild the fetcher result from a frame header and body
+ */
+function decodeResult(header, body) {
+  const { body_fields: bodyFields, encoding, ...result } = header;
+  if (body.length > 0) {
+    let raw = body;
+    if (encoding === 'gzip') {
+      raw = zlib.gunzipSync(body);
+    } else if (encoding && encoding !== 'identity') {
+      throw new Error(`Unknown frame body encoding: ${encoding}`);
+    }
+    Object.assign(result, JSON.parse(raw.toString('utf8')));
+  }
+  return result;
+}
+
+/**
+ * Run transcript_fetcher.py in framed mode and resolve with its result.
+ * Logging (including --debug output) arrives on stderr and is passed to onLog.
+ */
+function runFramedFetcher(pythonExecutable, scriptPath, args, { compress = false, onLog = console.error } = {}) {
+  return new Promise((resolve, reject) => {
+    const fetcherArgs = [scriptPath, '--framed', ...(compress ? ['--compress'] : []), ...args];
+    const child = spawn(pythonExecutable, fetcherArgs);
+    const decoder = new FrameDecoder();
+    let result = null;
+
+    child.stdout.on('data', (chunk) => {
+      try {
+        const results = decoder.push(chunk);
+        if (results.length > 0 && result === null) {
+          result = results[0];
+        }
+      } catch (error) {
+        child.kill();
+        reject(error);
+      }
+    });
+
+    child.stderr.on('data', (data) => onLog(data.toString()));
+    child.on('error', reject);
+    child.on('close', (code) => {
+      if (result !== null) {
+        resolve(result);
+      } else {
+        reject(new Error(`Transcript fetcher exited with code ${code} without a result`));
+      }
+    });
+  });
+}
+
+module.exports = { FrameDecoder, decodeResult, runFramedFetcher };
@@ -0,0 +1,73 @@
+# shard_stubs.py - Fetch functions loaded by spawned shard workers in test_transcript_shards.py
+
+import os
+import time
+
+from config.proxy_config import get_proxy_host_port
+
+def fetch(video_id):
+    """Succeeds unless the worker's identity is the blocked proxy or the video has no captions."""
+    host = get_proxy_host_port()
+    if host and host.startswith('blocked.'):
+        return {'success': False, 'error': 'HTTP Error 429: Too Many Requests', 'video_id': video_id}
+    if video_id.startswith('nocaptions'):
+        return {'success': False, 'error': 'No captions available for this video', 'video_id': video_id}
+    return {'success': True, 'transcript': f"transcript for {video_id}", 'video_id': video_id, 'proxy': host}
+
+def slow_fetch(video_id):
+    time.sleep(float(os.environ.get('SHARD_STUB_DELAY', '2')))
+    return fetch(video_id)
+
+class _FakeTranscript:
+    language = 'English'
+    language_code = 'en'
+    is_generated = False
+
+    def __init__(self, video_id):
+        self.video_id = video_id
+
+    def fetch(self):
+        return [{'text': f"transcript for {self.video_id}", 'start': 0.0, 'duration': 1.0}]
+
+class _FakeTranscriptList:
+    def __init__(self, video_id):
+        self.transcripts = [_FakeTranscript(video_id)]
+
+    def __iter__(self):
+        return iter(self.transcripts)
+
+    def find_transcript(self, language_codes):
+        return self.transcripts[0]
+
+class _FakeListFetcher:
+    """Stands in for youtube_transcript_api's TranscriptListFetcher, failing like YouTube would."""
+
+    def __init__(self, http_client):
+        self.http_client = http_client
+
+    def fetch(self, video_id):
+        from youtube_transcript_api._errors import TooManyRequests, TranscriptsDisabled
+        host = get_proxy_host_port()
+        if video_id.startswith('nocaptions'):
+            raise TranscriptsDisabled(video_id)
+        if host and host.startswith('blocked.'):
+            raise TooManyRequests(video_id)
+        return _FakeTranscriptList(video_id)
+
+def patch_fetcher(setter):
+    """Point transcript_fetcher at the fake YouTube; setter is setattr or monkeypatch.setattr."""
+    import transcript_fetcher
+    setter(transcript_fetcher, 'TranscriptListFetcher', _FakeListFetcher)
+    setter(transcript_fetcher, 'API_RETRY_DELAY', 0)
+    setter(transcript_fetcher, 'try_ytdlp', False)
+    setter(transcript_fetcher, 'try_requests', False)
+    return transcript_fetcher
+
+def fetch_via_get_transcript(video_id):
+    """The real get_transcript against the fake YouTube, so failures have the production shape."""
+    return patch_fetcher(setattr).get_transcript(video_id)
+
+def noisy_fetch(video_id):
+    """Prints to stdout like log_proxy_status does, which must not reach the CLI's JSON output."""
+    print(f"[PROXY] Proxy enabled: noise for {video_id}", flush=True)
+    return fetch(video_id)
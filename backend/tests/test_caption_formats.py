@@ -0,0 +1,41 @@
+import json
+import multiprocessing
+
+import pytest
+
+import caption_formats
+
+@pytest.fixture(autouse=True)
+def stats_path(tmp_path, monkeypatch):
+    path = str(tmp_path / 'caption_format_stats.json')
+    monkeypatch.setattr(caption_formats, 'FORMAT_STATS_PATH', path)
+    monkeypatch.setattr(caption_formats, '_stats', {})
+    monkeypatch.setattr(caption_formats, '_stats_mtime', None)
+    return path
+
+def _record_many(path, count):
+    caption_formats.FORMAT_STATS_PATH = path
+    for i in range(count):
+        caption_formats.record_format_outcome('asr', 'en', 'json3', i % 2 == 0)
+
+def test_default_order_without_stats():
+    assert caption_formats.get_format_order('asr', 'en') == ['txt', 'json3']
+
+def test_learned_order_falls_back_to_track_kind():
+    caption_formats.record_format_outcome('asr', 'en', 'txt', False)
+    caption_formats.record_format_outcome('asr', 'en', 'json3', True)
+    assert caption_formats.get_format_order('asr', 'en') == ['json3', 'txt']
+    assert caption_formats.get_format_order('asr', 'de') == ['json3', 'txt']
+    assert caption_formats.get_format_order('manual', 'en') == ['txt', 'json3']
+
+def test_concurrent_processes_do_not_lose_counts(stats_path):
+    context = multiprocessing.get_context('spawn')
+    processes = [context.Process(target=_record_many, args=(stats_path, 25)) for _ in range(4)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join(60)
+
+    with open(stats_path) as f:
+        counts = json.load(f)['asr:en']['json3']
+    assert counts['success'] + counts['failure'] == 100
@@ -0,0 +1,99 @@
+import json
+import os
+
+import pytest
+
+from linkedin_snapshots import (READ_CHUNK_SIZE, connect, engagement_history, iter_snapshot,
+                                latest_posts, load_directory, load_snapshot)
+
+@pytest.fixture
+def conn(tmp_path):
+    conn = connect(str(tmp_path / 'snapshots.db'))
+    yield conn
+    conn.close()
+
+def _post(post_id, date, likes=1, **fields):
+    return {'id': post_id, 'date': date, 'content': f"post {post_id}", 'likes': likes, 'comments': 0,
+            'shares': 0, 'reactions': [], **fields}
+
+def _write_snapshot(directory, username, snapshot_ms, posts, **fields):
+    path = os.path.join(str(directory), f"linkedin_posts_{username}_{snapshot_ms}.json")
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'userId': 'u1', 'profileData': {'name': 'Ada'}, 'posts': posts, **fields}, f)
+    return path
+
+def test_string_split_across_the_chunk_edge(tmp_path):
+    value = 'x' * 100
+    head = '{"posts": [], "pad": "'
+    # Place the split in the middle of "value"
+    padding = 'p' * (READ_CHUNK_SIZE - len(head) - len('", "value": "') - 50)
+    text = head + padding + '", "value": "' + value + '"}'
+    path = tmp_path / 'split.json'
+    path.write_text(text)
+    assert list(iter_snapshot(str(path))) == [('field', ('pad', padding)), ('field', ('value', value))]
+
+@pytest.mark.parametrize('tail', ['678}', '}'])
+def test_number_ending_exactly_at_the_buffer_end(tmp_path, tail):
+    head = '{"posts": [], "pad": "'
+    number_head = '", "n": 12345'
+    padding = 'p' * (READ_CHUNK_SIZE - len(head) - len(number_head))
+    text = head + padding + number_head + tail
+    assert text.index(number_head) + len(number_head) == READ_CHUNK_SIZE
+    path = tmp_path / 'number.json'
+    path.write_text(text)
+    fields = dict(item for _, item in iter_snapshot(str(path)))
+    assert fields['n'] == (12345678 if tail == '678}' else 12345)
+
+def test_posts_spanning_many_chunks(tmp_path):
+    posts = [_post(f"p{i}", f"2024-01-{i % 28 + 1:02d}", content_padding='z' * 1000) for i in range(200)]
+    path = _write_snapshot(tmp_path, 'ada', 1000, posts)
+    assert os.path.getsize(path) > 2 * READ_CHUNK_SIZE
+    assert [item for kind, item in iter_snapshot(path) if kind == 'post'] == posts
+
+@pytest.mark.parametrize('text', ['{}', '{"posts": []}', '{ "posts" : [ ] , "userId": "u1" }'])
+def test_empty_snapshots(tmp_path, text):
+    path = tmp_path / 'empty.json'
+    path.write_text(text)
+    assert [kind for kind, _ in iter_snapshot(str(path))] == (['field'] if 'userId' in text else [])
+
+def test_unchanged_files_are_skipped_on_reload(conn, tmp_path):
+    path = _write_snapshot(tmp_path, 'ada', 1000, [_post('p1', '2024-01-01')])
+    assert load_directory(conn, str(tmp_path))['loaded'] == 1
+    assert load_directory(conn, str(tmp_path)) == {'loaded': 0, 'skipped': 1, 'posts_read': 0, 'errors': {}}
+
+    _write_snapshot(tmp_path, 'ada', 1000, [_post('p1', '2024-01-01'), _post('p2', '2024-01-02')])
+    os.utime(path, (os.path.getatime(path), os.path.getmtime(path) + 10))
+    assert load_snapshot(conn, path) == 2
+
+def test_history_rows_are_written_only_on_change(conn, tmp_path):
+    for snapshot_ms, likes in ((1000, 5), (2000, 5), (3000, 9), (4000, 9)):
+        load_snapshot(conn, _write_snapshot(tmp_path, 'ada', snapshot_ms, [_post('p1', '2024-01-01', likes)]))
+    history = engagement_history(conn, 'p1')
+    assert [(entry['snapshotAt'], entry['likes']) for entry in history] == [(1000, 5), (3000, 9)]
+    assert history[1]['delta'] == {'likes': 4, 'comments': 0, 'shares': 0}
+
+def test_latest_posts_are_ordered_by_post_date(conn, tmp_path):
+    posts = [_post('old', '2024-01-01'), _post('new', '2024-03-01'), _post('mid', '2024-02-01')]
+    load_snapshot(conn, _write_snapshot(tmp_path, 'ada', 1000, posts))
+    load_snapshot(conn, _write_snapshot(tmp_path, 'bob', 1000, [_post('bobs', '2024-04-01')]))
+    assert [post['id'] for post in latest_posts(conn, 'ada')] == ['new', 'mid', 'old']
+    assert [post['id'] for post in latest_posts(conn, 'ada', limit=2)] == ['new', 'mid']
+
+def test_author_details_are_stored_once(conn, tmp_path):
+    author = {'author': 'Ada', 'authorHeadline': 'Engineer', 'authorProfile': 'https://example.com/in/ada'}
+    posts = [_post('p1', '2024-01-01', authorAvatar='a1.png', **author),
+             _post('p2', '2024-01-02', authorAvatar='a1.png', **author)]
+    load_snapshot(conn, _write_snapshot(tmp_path, 'ada', 1000, posts))
+    load_snapshot(conn, _write_snapshot(tmp_path, 'ada', 2000, [_post('p2', '2024-01-02', authorAvatar='a2.png',
+                                                                      **author)]))
+
+    extras = [json.loads(row['extra']) for row in conn.execute("SELECT extra FROM posts")]
+    assert all(set(extra) == {'authorProfile'} for extra in extras)
+    assert conn.execute("SELECT COUNT(*) FROM authors").fetchone()[0] == 1
+    for post in latest_posts(conn, 'ada'):
+        assert (post['author'], post['authorHeadline'], post['authorAvatar']) == ('Ada', 'Engineer', 'a2.png')
+
+def test_author_details_without_a_profile_url_stay_on_the_post(conn, tmp_path):
+    load_snapshot(conn, _write_snapshot(tmp_path, 'ada', 1000, [_post('p1', '2024-01-01', author='Ada')]))
+    [post] = latest_posts(conn, 'ada')
+    assert post['author'] == 'Ada'
@@ -0,0 +1,23 @@
+import pytest
+
+from config.proxy_config import DEFAULT_COOKIE_FILE, PROXY_CONFIG, get_proxy_identities
+
+def test_identities_default_to_shared_proxy(monkeypatch):
+    monkeypatch.delenv('PROXY_IDENTITIES', raising=False)
+    identities = get_proxy_identities(3)
+    assert len(identities) == 3
+    assert all(identity['cookie_file'] == DEFAULT_COOKIE_FILE for identity in identities)
+    assert all('host' not in identity for identity in identities)
+
+def test_identities_are_reused_round_robin(monkeypatch):
+    monkeypatch.setenv('PROXY_IDENTITIES', '[{"host": "a.example"}, {"host": "b.example", "cookie_file": "b.txt"}]')
+    identities = get_proxy_identities(3)
+    assert [identity['host'] for identity in identities] == ['a.example', 'b.example', 'a.example']
+    assert identities[1]['cookie_file'] == 'b.txt'
+
+@pytest.mark.parametrize('value', ['not json', '{"host": "a.example"}', '["a.example"]', '[{"host": "a"}, 3]'])
+def test_malformed_identities_fall_back_to_default(monkeypatch, value):
+    monkeypatch.setenv('PROXY_IDENTITIES', value)
+    identities = get_proxy_identities(2)
+    assert [identity['name'] for identity in identities] == ['identity-0', 'identity-0']
+    assert PROXY_CONFIG['host'] not in [identity.get('host') for identity in identities]
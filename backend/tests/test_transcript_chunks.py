@@ -0,0 +1,74 @@
+import time
+
+import pytest
+
+from transcript_chunks import chunk_result, estimate_tokens, iter_chunks, iter_units
+
+def _segments(texts, step_ms=2000):
+    return [{'start_ms': i * step_ms, 'end_ms': (i + 1) * step_ms, 'text': text} for i, text in enumerate(texts)]
+
+def test_chunks_stay_under_the_token_budget_and_cover_the_transcript():
+    result = {'segments': _segments([f"segment number {i} says something" for i in range(200)])}
+    chunks = chunk_result(result, max_tokens=60, overlap_tokens=0)
+    assert len(chunks) > 1
+    assert all(chunk['tokens'] <= 60 for chunk in chunks)
+    assert ' '.join(chunk['text'] for chunk in chunks) == ' '.join(s['text'] for s in result['segments'])
+    assert [chunk['index'] for chunk in chunks] == list(range(len(chunks)))
+
+def test_chunks_carry_segment_timestamps():
+    chunks = chunk_result({'segments': _segments(['one two three.'] * 30)}, max_tokens=20, overlap_tokens=0)
+    assert chunks[0]['start_ms'] == 0
+    assert chunks[-1]['end_ms'] == 30 * 2000
+    for previous, current in zip(chunks, chunks[1:]):
+        assert current['start_ms'] == previous['end_ms']
+
+def test_chunks_prefer_sentence_ends_over_segment_boundaries():
+    texts = ['this part of the talk', 'ends right here.', 'and the next idea', 'keeps going on', 'and on'] * 6
+    chunks = chunk_result({'segments': _segments(texts)}, max_tokens=40, overlap_tokens=0)
+    assert all(chunk['text'].endswith('here.') for chunk in chunks[:-1])
+
+def test_overlap_repeats_the_previous_tail():
+    texts = [f"Sentence {i} is here." for i in range(40)]
+    chunks = chunk_result({'segments': _segments(texts)}, max_tokens=30, overlap_tokens=10)
+    for previous, current in zip(chunks, chunks[1:]):
+        assert 0 < current['overlap_tokens'] <= 10
+        assert current['start_ms'] < previous['end_ms']
+        assert current['text'].split('. ')[0] + '.' in previous['text']
+        assert current['tokens'] <= 30
+
+def test_untimed_transcripts_break_on_sentences_without_timestamps():
+    transcript = ' '.join(f"This is sentence number {i}." for i in range(50))
+    chunks = chunk_result({'transcript': transcript}, max_tokens=50, overlap_tokens=0)
+    assert all(chunk['start_ms'] is None and chunk['end_ms'] is None for chunk in chunks)
+    assert all(chunk['text'].endswith('.') for chunk in chunks)
+
+def test_oversized_segments_are_split_with_interpolated_times():
+    long_text = ' '.join(['word'] * 200)
+    chunks = chunk_result({'segments': [{'start_ms': 0, 'end_ms': 10000, 'text': long_text}]},
+                          max_tokens=50, overlap_tokens=0)
+    assert len(chunks) > 1
+    assert all(chunk['tokens'] <= 50 for chunk in chunks)
+    assert chunks[0]['start_ms'] == 0 and chunks[-1]['end_ms'] == 10000
+    assert all(a['end_ms'] <= b['start_ms'] for a, b in zip(chunks, chunks[1:]))
+
+def test_iter_chunks_is_lazy_and_linear():
+    def units(count):
+        for i in range(count):
+            yield {'text': 'a few words here.', 'start_ms': i, 'end_ms': i + 1, 'tokens': estimate_tokens('a few words here.')}
+
+    first = next(iter_chunks(units(10 ** 9), max_tokens=50, overlap_tokens=10))
+    assert first['index'] == 0
+
+    started = time.time()
+    small = sum(1 for _ in iter_chunks(units(20000), 200, 50))
+    small_time = time.time() - started
+    started = time.time()
+    large = sum(1 for _ in iter_chunks(units(200000), 200, 50))
+    large_time = time.time() - started
+    assert large >= small * 9
+    assert large_time < small_time * 30
+
+@pytest.mark.parametrize('max_tokens,overlap', [(0, 0), (100, 60), (100, -1)])
+def test_invalid_budgets_are_rejected(max_tokens, overlap):
+    with pytest.raises(ValueError):
+        list(iter_chunks(iter_units({'transcript': 'Hello there.'}), max_tokens, overlap))
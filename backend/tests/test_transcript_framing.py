@@ -0,0 +1,71 @@
+import io
+import json
+import os
+import shutil
+import subprocess
+import sys
+
+import pytest
+
+from transcript_framing import FrameError, decode_result, encode_result, iter_results, read_frame
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src')
+
+RESULT = {
+    'success': True,
+    'video_id': 'abc123',
+    'language': 'English',
+    'transcript': 'hello world ' * 5000,
+    'chunks': [{'index': 0, 'text': 'hello world', 'start_ms': 0, 'end_ms': 1000}]
+}
+
+@pytest.mark.parametrize('compress', [False, True])
+def test_result_round_trips(compress):
+    stream = io.BytesIO(encode_result(RESULT, compress))
+    header, body = read_frame(stream)
+    assert header['encoding'] == ('gzip' if compress else 'identity')
+    assert header['body_fields'] == ['chunks', 'transcript']
+    assert 'transcript' not in header
+    assert decode_result(header, body) == RESULT
+    assert read_frame(stream) is None
+
+def test_compression_shrinks_the_body():
+    assert len(encode_result(RESULT, compress=True)) < len(encode_result(RESULT)) // 10
+
+def test_results_without_bulky_fields_have_empty_bodies():
+    failure = {'success': False, 'error': 'No captions'}
+    assert list(iter_results(io.BytesIO(encode_result(failure) + encode_result(RESULT)))) == [failure, RESULT]
+
+def test_malformed_streams_are_rejected():
+    frame = encode_result(RESULT)
+    with pytest.raises(FrameError):
+        read_frame(io.BytesIO(b'[PROXY] Proxy enabled\n' + frame))
+    with pytest.raises(FrameError):
+        read_frame(io.BytesIO(frame[:-10]))
+
+def test_fetcher_writes_a_frame_and_keeps_logs_off_stdout():
+    completed = subprocess.run(
+        [sys.executable, os.path.join(SRC_DIR, 'transcript_fetcher.py'), '--framed', '--debug'],
+        capture_output=True, cwd=SRC_DIR, timeout=60
+    )
+    results = list(iter_results(io.BytesIO(completed.stdout)))
+    assert len(results) == 1
+    assert results[0]['success'] is False
+    assert 'Missing video ID' in results[0]['error']
+
+@pytest.mark.skipif(shutil.which('node') is None, reason='node is not installed')
+@pytest.mark.parametrize('compress', [False, True])
+def test_node_decoder_reads_split_frames(compress):
+    frames = encode_result({'success': False, 'error': 'x'}) + encode_result(RESULT, compress)
+    script = (
+        "const { FrameDecoder } = require(process.argv[1]);"
+        "const data = require('fs').readFileSync(0);"
+        "const decoder = new FrameDecoder(); const results = [];"
+        "for (let i = 0; i < data.length; i += 777) results.push(...decoder.push(data.subarray(i, i + 777)));"
+        "process.stdout.write(JSON.stringify(results));"
+    )
+    completed = subprocess.run(
+        ['node', '-e', script, os.path.join(SRC_DIR, 'utils', 'fetcherFrames.js')],
+        input=frames, capture_output=True, timeout=60, check=True
+    )
+    assert json.loads(completed.stdout) == [{'success': False, 'error': 'x'}, RESULT]
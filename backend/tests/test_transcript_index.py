@@ -0,0 +1,65 @@
+import json
+import sqlite3
+
+import pytest
+
+from transcript_index import build_windows, connect, index_cache_dir, index_result, search
+
+SEGMENTS = [
+    {'start_ms': 0, 'end_ms': 4000, 'text': 'welcome back to the channel'},
+    {'start_ms': 4000, 'end_ms': 9000, 'text': 'today we talk about sourdough'},
+    {'start_ms': 9000, 'end_ms': 15000, 'text': 'the starter needs flour and water'},
+    {'start_ms': 40000, 'end_ms': 45000, 'text': 'now we bake the sourdough loaf'},
+]
+
+@pytest.fixture
+def conn(tmp_path):
+    conn = connect(str(tmp_path / 'index.db'))
+    yield conn
+    conn.close()
+
+def _timed_result(video_id='vid1'):
+    return {'video_id': video_id, 'transcript': ' '.join(s['text'] for s in SEGMENTS), 'segments': SEGMENTS}
+
+def test_windows_record_segment_offsets():
+    windows = build_windows(SEGMENTS)
+    assert [(start, end) for start, end, _, _ in windows] == [(0, 15000), (40000, 45000)]
+    _, _, text, offsets = windows[0]
+    for (offset, start_ms, _), segment in zip(offsets, SEGMENTS):
+        assert text[offset:offset + len(segment['text'])] == segment['text']
+        assert start_ms == segment['start_ms']
+
+def test_hits_point_at_the_matching_segment(conn):
+    index_result(conn, _timed_result())
+    [video] = search(conn, 'starter flour')
+    assert video['hits'] == [{'start_ms': 9000, 'end_ms': 15000, 'timed': True,
+                              'snippet': video['hits'][0]['snippet']}]
+
+    [video] = search(conn, 'sourdough')
+    assert [(hit['start_ms'], hit['end_ms']) for hit in video['hits']] == [(4000, 9000), (40000, 45000)]
+
+def test_untimed_results_have_no_hit_timestamps(conn, tmp_path):
+    transcripts_dir = tmp_path / 'transcripts'
+    transcripts_dir.mkdir()
+    (transcripts_dir / 'vid2.json').write_text(json.dumps({'transcript': 'a talk about sourdough bread'}))
+    assert index_cache_dir(conn, str(transcripts_dir)) == {'indexed': 1, 'skipped': 0}
+
+    [video] = search(conn, 'sourdough')
+    assert [(hit['start_ms'], hit['end_ms'], hit['timed']) for hit in video['hits']] == [(None, None, False)]
+
+def test_older_indexes_gain_the_segments_column(tmp_path):
+    db_path = str(tmp_path / 'old.db')
+    old = sqlite3.connect(db_path)
+    old.execute("CREATE TABLE windows (id INTEGER PRIMARY KEY, video_id TEXT NOT NULL, "
+                "start_ms INTEGER, end_ms INTEGER, text TEXT NOT NULL)")
+    old.commit()
+    old.close()
+
+    conn = connect(db_path)
+    try:
+        assert 'segments' in [row['name'] for row in conn.execute("PRAGMA table_info(windows)")]
+        index_result(conn, _timed_result())
+        [video] = search(conn, 'starter')
+        assert video['hits'][0]['start_ms'] == 9000
+    finally:
+        conn.close()
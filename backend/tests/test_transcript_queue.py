@@ -0,0 +1,146 @@
+import json
+import time
+
+import pytest
+
+import transcript_queue
+from transcript_queue import (PRIORITY_INTERACTIVE, PRIORITY_PREFETCH, claim_job, connect, drain, enqueue,
+                              get_stats, list_jobs, process_job, requeue_dead, retry_delay)
+
+@pytest.fixture(autouse=True)
+def transcripts_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr('transcript_cache.TRANSCRIPTS_DIR', str(tmp_path / 'transcripts'))
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / 'queue.db')
+
+@pytest.fixture
+def conn(db_path):
+    conn = connect(db_path)
+    yield conn
+    conn.close()
+
+def fetch_ok(video_id):
+    return {'success': True, 'transcript': f"transcript for {video_id}", 'video_id': video_id, 'source': 'stub'}
+
+def fetch_fail(video_id):
+    return {'success': False, 'error': 'No captions'}
+
+def _job(conn, job_id):
+    return conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+
+def test_interactive_jobs_run_before_prefetch(conn, db_path):
+    order = []
+
+    def fetch(video_id):
+        order.append(video_id)
+        return fetch_ok(video_id)
+
+    for video_id in ('pre1', 'pre2'):
+        enqueue(conn, video_id)
+    enqueue(conn, 'now1', priority=PRIORITY_INTERACTIVE)
+    summary = drain(1, fetch_fn=fetch, db_path=db_path)
+    assert order == ['now1', 'pre1', 'pre2']
+    assert summary['done'] == 3
+
+def test_reenqueue_bumps_priority_of_the_pending_job(conn):
+    job_id = enqueue(conn, 'vid1')
+    enqueue(conn, 'vid2')
+    assert enqueue(conn, 'vid1', priority=PRIORITY_INTERACTIVE) == job_id
+    assert _job(conn, job_id)['priority'] == PRIORITY_INTERACTIVE
+    # A lower-priority re-enqueue never demotes it
+    enqueue(conn, 'vid1', priority=PRIORITY_PREFETCH)
+    assert _job(conn, job_id)['priority'] == PRIORITY_INTERACTIVE
+    assert claim_job(conn, 'w')['video_id'] == 'vid1'
+
+def test_failures_are_retried_with_backoff(conn):
+    job_id = enqueue(conn, 'vid1')
+    for attempt in (1, 2):
+        conn.execute("UPDATE jobs SET run_at = 0 WHERE id = ?", (job_id,))
+        job = claim_job(conn, 'w')
+        before = time.time()
+        assert process_job(conn, job, fetch_fail) == 'queued'
+        row = _job(conn, job_id)
+        assert row['attempts'] == attempt
+        assert row['last_error'] == 'No captions'
+        assert row['run_at'] >= before + retry_delay(attempt)
+    assert retry_delay(2) == 2 * retry_delay(1)
+    assert claim_job(conn, 'w') is None  # still backing off
+
+def test_jobs_dead_letter_after_max_attempts(conn):
+    job_id = enqueue(conn, 'vid1', max_attempts=2)
+    for expected in ('queued', 'dead'):
+        conn.execute("UPDATE jobs SET run_at = 0 WHERE id = ?", (job_id,))
+        assert process_job(conn, claim_job(conn, 'w'), fetch_fail) == expected
+    assert [job['video_id'] for job in list_jobs(conn, 'dead')] == ['vid1']
+
+def test_expired_leases_are_reclaimed_or_dead_lettered(conn):
+    retry_id = enqueue(conn, 'vid1', max_attempts=3)
+    final_id = enqueue(conn, 'vid2', max_attempts=1)
+    claim_job(conn, 'w')
+    claim_job(conn, 'w')
+    conn.execute("UPDATE jobs SET started_at = ?", (time.time() - transcript_queue.LEASE_TIMEOUT - 1,))
+
+    reclaimed = claim_job(conn, 'w2')
+    assert reclaimed['id'] == retry_id
+    assert reclaimed['attempts'] == 2
+    assert _job(conn, final_id)['status'] == 'dead'
+    assert claim_job(conn, 'w2') is None
+
+def test_cache_write_errors_fail_the_job(conn, monkeypatch):
+    def save_fails(result):
+        raise OSError(28, 'No space left on device')
+
+    monkeypatch.setattr(transcript_queue, 'save_transcript_result', save_fails)
+    job_id = enqueue(conn, 'vid1')
+    assert process_job(conn, claim_job(conn, 'w'), fetch_ok) == 'queued'
+    row = _job(conn, job_id)
+    assert row['status'] == 'queued'
+    assert 'No space left on device' in row['last_error']
+
+def test_requeue_dead_resets_the_attempt_budget(conn):
+    for video_id in ('vid1', 'vid2'):
+        enqueue(conn, video_id, max_attempts=1)
+        process_job(conn, claim_job(conn, 'w'), fetch_fail)
+    assert requeue_dead(conn, ['vid1']) == 1
+    job = claim_job(conn, 'w')
+    assert (job['video_id'], job['attempts']) == ('vid1', 1)
+    assert [job['video_id'] for job in list_jobs(conn, 'dead')] == ['vid2']
+    assert requeue_dead(conn) == 1
+
+def test_get_stats_reports_depth_and_throughput(conn, db_path):
+    enqueue(conn, 'vid1')
+    enqueue(conn, 'vid2', priority=PRIORITY_INTERACTIVE)
+    stats = get_stats(conn)
+    assert stats['counts'] == {'queued': 2, 'running': 0, 'done': 0, 'dead': 0}
+    assert set(stats['ready_by_priority']) == {str(PRIORITY_INTERACTIVE), str(PRIORITY_PREFETCH)}
+
+    enqueue(conn, 'vid3', max_attempts=1)
+    drain(2, fetch_fn=lambda video_id: fetch_fail(video_id) if video_id == 'vid3' else fetch_ok(video_id),
+          db_path=db_path)
+    stats = get_stats(conn)
+    assert stats['counts'] == {'queued': 0, 'running': 0, 'done': 2, 'dead': 1}
+    assert stats['completed'] == 2
+    assert stats['dead_lettered'] == 1
+    assert stats['queue_latency']['max'] >= 0
+    assert stats['ready_by_priority'] == {}
+
+def test_drain_cli_stdout_carries_only_json(tmp_path, monkeypatch, capsys):
+    def noisy_fetch(video_id):
+        print("[PROXY] Proxy enabled: noise", flush=True)
+        return {'success': True, 'transcript': f"transcript for {video_id}", 'video_id': video_id}
+
+    monkeypatch.setattr(transcript_queue, 'get_transcript', noisy_fetch)
+    monkeypatch.setattr(transcript_queue, 'warm_up', lambda: {'state': 'warm', 'connections': {}})
+    monkeypatch.setattr(transcript_queue, 'start_idle_refresher', lambda: None)
+    db_path = str(tmp_path / 'queue.db')
+    transcript_queue.main(['--db', db_path, 'enqueue', 'vid1', 'vid2'])
+    capsys.readouterr()
+
+    transcript_queue.main(['--db', db_path, 'drain', '--workers', '2'])
+    captured = capsys.readouterr()
+    lines = captured.out.splitlines()
+    assert len(lines) == 1
+    assert json.loads(lines[0])['done'] == 2
+    assert '[PROXY]' in captured.err
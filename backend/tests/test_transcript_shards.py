@@ -0,0 +1,135 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from transcript_shards import HashRing, ShardSupervisor
+
+VIDEO_IDS = [f"video{i:04d}" for i in range(500)]
+
+def _identity(name, host):
+    return {'name': name, 'host': host, 'port': '9999', 'enabled': True}
+
+@pytest.fixture(autouse=True)
+def transcripts_dir(tmp_path, monkeypatch):
+    # Spawned workers inherit the environment, so successful results land in tmp_path
+    monkeypatch.setenv('TRANSCRIPTS_DIR', str(tmp_path))
+    monkeypatch.setenv('TRANSCRIPT_INDEX_ENABLED', 'false')
+
+def test_hash_ring_ownership_is_stable():
+    ring = HashRing(['worker-0', 'worker-1', 'worker-2'])
+    same_ring = HashRing(['worker-2', 'worker-0', 'worker-1'])
+    for video_id in VIDEO_IDS:
+        assert ring.preference_list(video_id) == same_ring.preference_list(video_id)
+        assert sorted(ring.preference_list(video_id)) == ['worker-0', 'worker-1', 'worker-2']
+
+def test_hash_ring_spreads_keys_over_all_nodes():
+    ring = HashRing([f"worker-{i}" for i in range(4)])
+    owners = [ring.preference_list(video_id)[0] for video_id in VIDEO_IDS]
+    for i in range(4):
+        assert owners.count(f"worker-{i}") > len(VIDEO_IDS) / 10
+
+def test_hash_ring_removal_only_remaps_removed_node():
+    ring = HashRing([f"worker-{i}" for i in range(4)])
+    before = {video_id: ring.preference_list(video_id) for video_id in VIDEO_IDS}
+    ring.remove('worker-1')
+    for video_id in VIDEO_IDS:
+        after = ring.preference_list(video_id)
+        if before[video_id][0] != 'worker-1':
+            assert after[0] == before[video_id][0]
+        else:
+            # Keys of the removed node move to the next node in their preference list
+            assert after[0] == before[video_id][1]
+
+def test_identity_errors_are_rerouted_to_another_worker():
+    identities = [_identity('good', 'good.example'), _identity('blocked', 'blocked.example')]
+    supervisor = ShardSupervisor(2, identities=identities, fetch_target='shard_stubs:fetch').start()
+    try:
+        video_ids = VIDEO_IDS[:20]
+        results = supervisor.fetch_many(video_ids)
+        stats = supervisor.stats()
+    finally:
+        supervisor.stop(grace_period=10)
+
+    assert all(result['success'] for result in results)
+    assert all(result['worker'] == 'worker-0' for result in results)
+    assert stats['worker-1']['failed'] > 0
+    assert stats['worker-1']['healthy'] is False
+    assert stats['worker-0']['completed'] == len(video_ids)
+
+def test_video_errors_are_not_rerouted():
+    identities = [_identity('a', 'a.example'), _identity('b', 'b.example')]
+    supervisor = ShardSupervisor(2, identities=identities, fetch_target='shard_stubs:fetch').start()
+    try:
+        result = supervisor.submit('nocaptions-1').result(timeout=30)
+        stats = supervisor.stats()
+    finally:
+        supervisor.stop(grace_period=10)
+
+    assert result['success'] is False
+    assert sum(worker['assigned'] for worker in stats.values()) == 1
+
+def test_stop_waits_for_in_flight_jobs(monkeypatch):
+    monkeypatch.setenv('SHARD_STUB_DELAY', '2')
+    identities = [_identity('a', 'a.example'), _identity('b', 'b.example')]
+    supervisor = ShardSupervisor(2, identities=identities, fetch_target='shard_stubs:slow_fetch').start()
+    futures = [supervisor.submit(video_id) for video_id in ('vid1', 'vid2', 'vid3')]
+    supervisor.stop()
+
+    assert all(future.done() for future in futures)
+    assert all(future.result()['success'] for future in futures)
+
+def test_stop_resolves_jobs_left_after_grace_period(monkeypatch):
+    monkeypatch.setenv('SHARD_STUB_DELAY', '5')
+    identities = [_identity('a', 'a.example')]
+    supervisor = ShardSupervisor(1, identities=identities, fetch_target='shard_stubs:slow_fetch').start()
+    futures = [supervisor.submit(video_id) for video_id in ('vid1', 'vid2')]
+    supervisor.stop(grace_period=0.5)
+
+    assert all(future.done() for future in futures)
+    assert not any(future.result()['success'] for future in futures)
+
+def test_get_transcript_failures_carry_an_error_kind(monkeypatch):
+    from config import proxy_config
+    from shard_stubs import patch_fetcher
+    fetcher = patch_fetcher(monkeypatch.setattr)
+    monkeypatch.setattr(proxy_config, '_active_identity', _identity('blocked', 'blocked.example'))
+
+    blocked = fetcher.get_transcript('video0001')
+    assert blocked['error'] == 'All transcript extraction methods failed'
+    assert blocked['error_kind'] == 'blocked'
+    assert [error['error_type'] for error in blocked['errors']] == ['TooManyRequests', 'TooManyRequests']
+
+    missing = fetcher.get_transcript('nocaptions-1')
+    assert missing['error_kind'] == 'no_transcript'
+
+def test_real_error_shape_is_rerouted():
+    identities = [_identity('good', 'good.example'), _identity('blocked', 'blocked.example')]
+    supervisor = ShardSupervisor(2, identities=identities, fetch_target='shard_stubs:fetch_via_get_transcript').start()
+    try:
+        video_ids = VIDEO_IDS[:10]
+        results = supervisor.fetch_many(video_ids)
+        missing = supervisor.submit('nocaptions-2').result(timeout=30)
+        stats = supervisor.stats()
+    finally:
+        supervisor.stop(grace_period=10)
+
+    assert all(result['success'] and result['worker'] == 'worker-0' for result in results)
+    assert stats['worker-1']['healthy'] is False
+    assert missing['error_kind'] == 'no_transcript'
+
+def test_cli_stdout_carries_only_json():
+    tests_dir = os.path.dirname(os.path.abspath(__file__))
+    src_dir = os.path.join(os.path.dirname(tests_dir), 'src')
+    env = {**os.environ, 'PYTHONPATH': os.pathsep.join([src_dir, tests_dir])}
+    completed = subprocess.run(
+        [sys.executable, os.path.join(src_dir, 'transcript_shards.py'), '--workers', '2',
+         '--fetch-target', 'shard_stubs:noisy_fetch', 'fetch', 'vid1', 'vid2'],
+        capture_output=True, text=True, env=env, timeout=120, check=True
+    )
+    lines = completed.stdout.splitlines()
+    assert len(lines) == 1
+    assert [result['video_id'] for result in json.loads(lines[0])['results']] == ['vid1', 'vid2']
+    assert '[PROXY]' in completed.stderr
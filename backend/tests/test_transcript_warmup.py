@@ -0,0 +1,99 @@
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import transcript_warmup
+
+class _NoContentHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        self.server.hits += 1
+        self.send_response(204)
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), _NoContentHandler)
+    httpd.hits = 0
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+@pytest.fixture(autouse=True)
+def isolated_pool(monkeypatch, server):
+    monkeypatch.setattr(transcript_warmup, 'YOUTUBE_HOSTS', ['localhost'])
+    monkeypatch.setattr(transcript_warmup, 'WARMUP_URL', f"http://127.0.0.1:{server.server_port}/generate_204")
+    monkeypatch.setattr(transcript_warmup, 'get_proxy_config', lambda: None)
+    monkeypatch.setattr(transcript_warmup, '_sessions', {})
+    monkeypatch.setattr(transcript_warmup, '_refresher', None)
+    monkeypatch.setattr(transcript_warmup, '_status', {
+        'state': 'cold', 'started_at': None, 'completed_at': None,
+        'dns': {}, 'connections': {}, 'last_refresh': None, 'refreshes': 0
+    })
+
+def _closed_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+def test_warm_up_preconnects_the_pooled_session(server):
+    status = transcript_warmup.warm_up()
+    assert status['state'] == 'warm'
+    assert status['connections']['direct']['status'] == 204
+    assert status['dns']['localhost']['ok']
+    assert server.hits == 1
+    # The fetcher gets back the session that was just connected
+    assert status['sessions'] == 1
+    assert transcript_warmup.get_http_session() is transcript_warmup.get_http_session()
+
+def test_warm_up_reports_degraded_when_unreachable(monkeypatch):
+    monkeypatch.setattr(transcript_warmup, 'WARMUP_URL', f"http://127.0.0.1:{_closed_port()}/generate_204")
+    status = transcript_warmup.warm_up(timeout=2)
+    assert status['state'] == 'degraded'
+    assert not status['connections']['direct']['ok']
+
+def test_sessions_are_pooled_per_thread():
+    sessions = []
+    thread = threading.Thread(target=lambda: sessions.append(transcript_warmup.get_http_session()))
+    thread.start()
+    thread.join()
+    assert sessions[0] is not transcript_warmup.get_http_session()
+
+def test_refresh_touches_only_idle_sessions_and_drops_dead_threads(server):
+    transcript_warmup.get_http_session()
+    thread = threading.Thread(target=transcript_warmup.get_http_session)
+    thread.start()
+    thread.join()
+
+    assert transcript_warmup.refresh_idle_sessions(max_idle=60) == {}
+    assert len(transcript_warmup._sessions) == 1  # the exited thread's session is gone
+
+    refreshed = transcript_warmup.refresh_idle_sessions(max_idle=0)
+    assert refreshed['direct']['ok']
+    assert server.hits == 1
+    assert transcript_warmup.get_warmup_status()['refreshes'] == 2
+
+def test_idle_refresher_runs_once_per_process(server):
+    transcript_warmup.get_http_session()
+    thread = transcript_warmup.start_idle_refresher(interval=0.05)
+    assert transcript_warmup.start_idle_refresher(interval=0.05) is thread
+    deadline = time.time() + 5
+    while server.hits == 0 and time.time() < deadline:
+        time.sleep(0.02)
+    assert server.hits >= 1
+    transcript_warmup._refresher[1].set()
+
+def test_health_check_reports_warmup_status(server):
+    from transcript_fetcher import health_check
+    health = health_check()
+    assert health['success'] is True
+    assert {'proxy_enabled', 'proxy_host', 'message'} <= set(health)
+    assert health['warmup']['state'] == 'warm'
+    assert health['warmup']['connections']['direct']['status'] == 204
@@ -0,0 +1,116 @@
+"""Local stand-in for the YouTube endpoints used by the manual scraping paths.
+
+Video IDs pick the behaviour:
+  good*       captions work in every format
+  txtbroken*  txt captions are too short, json3 works (format fallback)
+  flaky*      txt captions return 503, json3 works (transport error)
+  gzip*       watch page is gzip-compressed
+  nocaps*     watch page has no caption tracks
+  forbidden*  watch page returns 403
+  slow*       watch page takes two seconds
+
+The server also accepts absolute-form requests, so it can stand in for an HTTP proxy.
+"""
+
+import gzip
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+SENTENCES = [
+    "Welcome back to the channel everyone.",
+    "Today we are looking at how transcripts are fetched.",
+    "First the watch page is downloaded and parsed.",
+    "Then the caption track is requested in a given format.",
+    "Finally the text is validated and returned to the caller."
+]
+
+def watch_page(base, video_id):
+    track_url = f"{base}/api/timedtext?v={video_id}\\u0026lang=en\\u0026kind=asr"
+    return (
+        '<html><head><link itemprop="name" content="Ignored Channel"></head><body><script>'
+        'var ytInitialPlayerResponse = {"videoDetails":{"lengthSeconds":"3725","channelName":"Stand-in Channel"},'
+        '"captions":{"playerCaptionsTracklistRenderer":{"captionTracks":[{"baseUrl":"' + track_url + '",'
+        '"name":{"simpleText":"English (auto-generated)"},"vssId":"a.en","languageCode":"en","kind":"asr"}],'
+        '"translationLanguages":[]}}};</script></body></html>'
+    )
+
+def caption_body(fmt, video_id):
+    if fmt == 'txt':
+        return 'too short' if video_id.startswith('txtbroken') else ' '.join(SENTENCES)
+    events = [
+        {'tStartMs': i * 4000, 'dDurationMs': 4000, 'segs': [{'utf8': sentence}]}
+        for i, sentence in enumerate(SENTENCES)
+    ]
+    return json.dumps({'events': [{'tStartMs': 0}] + events})
+
+class StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status, body=b'', headers=None):
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Connection', 'close')
+        self.end_headers()
+        self.wfile.write(body)
+        self.close_connection = True
+
+    def do_GET(self):
+        server = self.server
+        url = urlsplit(self.path)  # absolute form when used as a proxy
+        query = {key: values[0] for key, values in parse_qs(url.query).items()}
+        with server.lock:
+            server.requests.append({
+                'path': url.path, 'query': query, 'proxied': bool(url.scheme),
+                'proxy_authorization': self.headers.get('Proxy-Authorization'),
+                'cookie': self.headers.get('Cookie')
+            })
+
+        if url.path == '/watch':
+            video_id = query.get('v', '')
+            with server.lock:
+                server.in_flight += 1
+                server.max_in_flight = max(server.max_in_flight, server.in_flight)
+            try:
+                time.sleep(2 if video_id.startswith('slow') else server.delay)
+                if video_id.startswith('forbidden'):
+                    return self._send(403)
+                if video_id.startswith('nocaps'):
+                    return self._send(200, b'<html>no captions here</html>')
+                body = watch_page(server.base_url, video_id).encode('utf-8')
+                headers = {'Content-Type': 'text/html', 'Set-Cookie': 'VISITOR_INFO=standin; Path=/'}
+                if video_id.startswith('gzip'):
+                    body = gzip.compress(body)
+                return self._send(200, body, headers)
+            finally:
+                with server.lock:
+                    server.in_flight -= 1
+
+        if url.path == '/api/timedtext':
+            video_id, fmt = query.get('v', ''), query.get('fmt')
+            if video_id.startswith('flaky') and fmt == 'txt':
+                return self._send(503)
+            return self._send(200, caption_body(fmt, video_id).encode('utf-8'))
+
+        self._send(404)
+
+def start_server(delay=0.0):
+    """Start a stand-in server on a free port; the caller must call shutdown() and server_close()."""
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StandInHandler)
+    server.daemon_threads = True
+    server.handle_error = lambda request, client_address: None  # clients that time out hang up early
+    server.base_url = f"http://127.0.0.1:{server.server_port}"
+    server.delay = delay
+    server.lock = threading.Lock()
+    server.requests = []
+    server.in_flight = 0
+    server.max_in_flight = 0
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server